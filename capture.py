@@ -0,0 +1,113 @@
+import os
+import sys
+import threading
+import collections
+import time
+import cv2
+
+# OpenCV's default pool uses every core, which oversubscribes the CPU next to
+# the inference thread; half the cores is plenty for decode/resize
+cv2.setNumThreads(max(1, (os.cpu_count() or 2) // 2))
+
+# Reads failing back to back for this long mean the camera is gone or the stream ended
+READ_FAILURE_TIMEOUT = 5.0
+
+def open_camera(index):
+    """Open a camera with an explicit backend, skipping OpenCV's backend autoprobe"""
+    backend = None
+    if sys.platform == "win32":
+        backend = cv2.CAP_DSHOW  # MSMF is probed first otherwise and can take seconds
+    elif sys.platform.startswith("linux"):
+        backend = cv2.CAP_V4L2
+
+    if backend is not None:
+        cap = cv2.VideoCapture(index, backend)
+        if cap.isOpened():
+            cap.setExceptionMode(False)
+            return cap
+    return cv2.VideoCapture(index)
+
+def configure_capture(cap, width=640, height=480, fps=30, fourcc="MJPG"):
+    """Request a pixel format (compressed MJPG by default) at a fixed size and rate with a one-frame buffer"""
+    # MJPG needs far less USB bandwidth than raw YUYV and decodes faster than YUYV->BGR
+    if fourcc:
+        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+    cap.set(cv2.CAP_PROP_FPS, fps)
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # Don't let the driver queue up stale frames
+
+    actual = int(cap.get(cv2.CAP_PROP_FOURCC))
+    fourcc_str = "".join(chr((actual >> (8 * i)) & 0xFF) for i in range(4))
+    if fourcc and fourcc_str != fourcc:
+        print(f"Camera does not support {fourcc}, using {fourcc_str!r}")
+    return fourcc_str
+
+class FrameGrabber:
+    """Reads a VideoCapture on a background thread.
+
+    In realtime mode only the newest frame is kept, so a slow consumer always gets the
+    latest image. Otherwise up to queue_size frames are queued and none are dropped.
+    ended is set once the stream has stopped delivering frames for good."""
+    def __init__(self, cap, realtime=True, queue_size=8):
+        self.cap = cap
+        self.realtime = realtime
+        self._cond = threading.Condition()
+        self._frames = collections.deque()
+        self._queue_size = queue_size
+        self._running = False
+        self._thread = None
+        self.ended = False
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._running = False
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def _run(self):
+        failing_since = None
+        while self._running:
+            ret, frame = self.cap.read()
+            if not ret:
+                # Transient stalls are retried; a closed device or a long run of failures ends the stream
+                now = time.monotonic()
+                failing_since = failing_since or now
+                if not self.cap.isOpened() or now - failing_since > READ_FAILURE_TIMEOUT:
+                    with self._cond:
+                        self.ended = True
+                        self._cond.notify_all()
+                    return
+                time.sleep(0.01)
+                continue
+            failing_since = None
+
+            with self._cond:
+                if self.realtime:
+                    # Replace any frame the consumer has not taken yet - stale frames are dropped
+                    self._frames.clear()
+                else:
+                    # Queue mode: wait for room instead of dropping
+                    while len(self._frames) >= self._queue_size and self._running and not self.realtime:
+                        self._cond.wait(0.1)
+                self._frames.append(frame)
+                self._cond.notify_all()
+
+    def read(self, timeout=1.0):
+        """Wait for the next frame, same (ret, frame) result as cap.read().
+
+        ret is also False when no frame arrived within timeout; check ended to tell the two apart."""
+        with self._cond:
+            if not self._frames and not self.ended:
+                self._cond.wait(timeout)
+            frame = self._frames.popleft() if self._frames else None
+            self._cond.notify_all()
+        return frame is not None, frame
@@ -1,85 +1,118 @@
 import cv2
+import logging
+import collections
+import numpy as np
+from counter_kernels import count_crossings
+
+# Crossing events are logged at DEBUG so busy scenes don't block on stdout
+logger = logging.getLogger("counter")
+logger.setLevel(logging.WARNING)
+logger.propagate = False
+
+# Side of the counting line: above/left of the line is -1, below/right is +1, 0 = not seen yet
+SIDE_UNSEEN = 0
 
 class PeopleCounter:
-    def __init__(self, line_position=300, direction="horizontal", max_capacity=50):
+    def __init__(self, line_position=300, direction="horizontal", max_capacity=50, track_capacity=256):
         self.line_position = line_position
         self.direction = direction
         self.count_in = 0
         self.count_out = 0
-        self.track_memory = {}
+        self._inside = 0  # count_in - count_out, kept up to date on crossings
         self.max_capacity = max_capacity
-        self.track_states = {}  # Track which side of line each person is on
+        self.recent_events = collections.deque(maxlen=32)  # (track_id, "in"/"out") for the UI
 
-    def check_crossing(self, track_id, bbox):
-        x1, y1, x2, y2 = bbox
-        cx, cy = int((x1 + x2) / 2), int((y1 + y2) / 2)
-
-        # Use correct coordinate based on direction
-        current_pos = cy if self.direction == "horizontal" else cx
-
-        if track_id not in self.track_memory:
-            # First time seeing this track - just store position
-            self.track_memory[track_id] = current_pos
-            # Determine initial side of the line
-            if self.direction == "horizontal":
-                self.track_states[track_id] = "above" if cy < self.line_position else "below"
-            else:
-                self.track_states[track_id] = "left" if cx < self.line_position else "right"
+        # Per-track state kept as parallel arrays indexed by a compact slot number
+        self.track_slots = {}  # track_id -> slot
+        self.free_slots = []
+        self.pos = np.full(track_capacity, -1, np.int32)  # Last center coordinate along the crossing axis
+        self.side = np.zeros(track_capacity, np.int8)  # Which side of line each person is on
+
+    @property
+    def direction(self):
+        return self._direction
+
+    @direction.setter
+    def direction(self, direction):
+        """Resolve the direction string once: cy is compared for a horizontal line, cx for vertical"""
+        self._direction = direction
+        self.axis = 1 if direction == "horizontal" else 0
+
+    def _slots_for(self, track_ids):
+        """Map track ids to array slots, allocating slots for new tracks"""
+        slots = np.empty(len(track_ids), np.int32)
+        for i, track_id in enumerate(track_ids):
+            slot = self.track_slots.get(track_id)
+            if slot is None:
+                slot = self.free_slots.pop() if self.free_slots else len(self.track_slots)
+                if slot >= len(self.side):
+                    # Grow the arrays geometrically when more tracks are alive than expected
+                    grow = len(self.side)
+                    self.pos = np.concatenate([self.pos, np.full(grow, -1, np.int32)])
+                    self.side = np.concatenate([self.side, np.zeros(grow, np.int8)])
+                self.track_slots[track_id] = slot
+            slots[i] = slot
+        return slots
+
+    def update_batch(self, track_ids, bboxes):
+        """Check line crossings for all tracks of a frame in one vectorized pass"""
+        if len(track_ids) == 0:
             return
 
-        prev_pos = self.track_memory[track_id]
-        prev_state = self.track_states.get(track_id)
-
-        if self.direction == "horizontal":
-            # Horizontal line crossing (people move up/down)
-            current_state = "above" if cy < self.line_position else "below"
-            
-            # Check for crossing
-            if prev_state == "above" and current_state == "below":
-                self.count_in += 1  # Crossing from above to below = entering
-                print(f"Person {track_id} entered (above->below)")
-            elif prev_state == "below" and current_state == "above":
-                self.count_out += 1  # Crossing from below to above = exiting
-                print(f"Person {track_id} exited (below->above)")
-                
-        else:  # Vertical line crossing
-            # Vertical line crossing (people move left/right)
-            current_state = "left" if cx < self.line_position else "right"
-            
-            # Check for crossing
-            if prev_state == "left" and current_state == "right":
-                self.count_in += 1  # Crossing from left to right = entering
-                print(f"Person {track_id} entered (left->right)")
-            elif prev_state == "right" and current_state == "left":
-                self.count_out += 1  # Crossing from right to left = exiting
-                print(f"Person {track_id} exited (right->left)")
-
-        # Update memory
-        self.track_memory[track_id] = current_pos
-        self.track_states[track_id] = current_state
+        # Native ids hash faster than NumPy scalars and keep the reported events plain Python
+        if isinstance(track_ids, np.ndarray):
+            track_ids = track_ids.tolist()
+        slots = self._slots_for(track_ids)
+        bboxes = np.asarray(bboxes, dtype=np.int32).reshape(-1, 4)
+        centers = (bboxes[:, :2] + bboxes[:, 2:]) >> 1  # (cx, cy) per track
+
+        events = np.empty(len(slots), np.int8)
+        entered, exited = count_crossings(slots, centers, self.axis, int(self.line_position),
+                                          self.pos, self.side, events)
+        self.count_in += entered
+        self.count_out += exited
+        self._inside += entered - exited
+
+        # Only the (rare) crossing tracks are reported at the Python level
+        if entered or exited:
+            for i in np.flatnonzero(events):
+                event = "in" if events[i] > 0 else "out"
+                self.recent_events.append((track_ids[i], event))
+                logger.debug("Person %s crossed the line (%s)", track_ids[i], event)
+
+    def check_crossing(self, track_id, bbox):
+        """Check a single track for a line crossing"""
+        self.update_batch([track_id], [bbox])
 
     def cleanup_lost_tracks(self, active_track_ids):
         """Remove tracking data for tracks that are no longer active"""
-        lost_tracks = set(self.track_memory.keys()) - set(active_track_ids)
-        for track_id in lost_tracks:
-            if track_id in self.track_memory:
-                del self.track_memory[track_id]
-            if track_id in self.track_states:
-                del self.track_states[track_id]
+        active = set(active_track_ids.tolist() if isinstance(active_track_ids, np.ndarray)
+                     else active_track_ids)
+        lost_slots = [self.track_slots.pop(track_id)
+                      for track_id in list(self.track_slots) if track_id not in active]
+        if not lost_slots:
+            return
+        self.pos[lost_slots] = -1
+        self.side[lost_slots] = SIDE_UNSEEN
+        self.free_slots.extend(lost_slots)
 
     def get_counts(self):
         return self.count_in, self.count_out
 
     def get_current_inside(self):
-        return max(0, self.count_in - self.count_out)
+        return self._inside if self._inside > 0 else 0
 
     def is_over_capacity(self):
-        current_inside = self.get_current_inside()
+        current_inside = self._inside if self._inside > 0 else 0
         return current_inside > self.max_capacity, current_inside
 
     def reset_counts(self):
         """Reset all counts and tracking data"""
         self.count_in = 0
         self.count_out = 0
-        self.track_memory.clear()
-        self.track_states.clear()
\ No newline at end of file
+        self._inside = 0
+        self.recent_events.clear()
+        self.track_slots.clear()
+        self.free_slots.clear()
+        self.pos.fill(-1)
+        self.side.fill(SIDE_UNSEEN)
@@ -0,0 +1,64 @@
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    print("Warning: numba not available. Install with: pip install numba")
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        return lambda func: func
+
+
+# Explicit signature: compiled once when the module is imported (and cached on disk),
+# so the first camera frame never pays the JIT cost and calls skip type dispatch.
+# nogil lets the GUI thread run while the inference thread is inside the kernel.
+@njit("UniTuple(int64, 2)(int32[:], int32[:, :], int64, int64, int32[:], int8[:], int8[:])",
+      cache=True, fastmath=True, nogil=True)
+def crossing_kernel(slots, centers, axis, line_pos, pos_arr, side_arr, events):
+    """Update per-slot sides and return (entered, exited); events gets +1/-1/0 per track"""
+    d_in = 0
+    d_out = 0
+    for i in range(slots.shape[0]):
+        slot = slots[i]
+        coord = centers[i, axis]
+        new_side = -1 if coord < line_pos else 1
+        prev_side = side_arr[slot]
+
+        # Sides are -1/+1 (0 = unseen), so a crossing is a sign flip: negative product
+        flipped = prev_side * new_side < 0
+        event = new_side if flipped else 0
+        d_in += event > 0
+        d_out += event < 0
+        events[i] = event
+
+        pos_arr[slot] = coord
+        side_arr[slot] = new_side
+    return d_in, d_out
+
+
+def crossing_numpy(slots, centers, axis, line_pos, pos_arr, side_arr, events):
+    """Vectorized NumPy equivalent of crossing_kernel, used when numba is missing"""
+    coords = centers[:, axis]
+    new_side = np.where(coords < line_pos, -1, 1).astype(np.int8)
+    prev_side = side_arr[slots]
+
+    # A side flip of +2 is an entry, -2 an exit; unseen tracks (side 0) never count
+    crossings = np.where(prev_side != 0, new_side - prev_side, 0)
+    events[:] = crossings // 2
+
+    pos_arr[slots] = coords
+    side_arr[slots] = new_side
+    return int(np.count_nonzero(crossings == 2)), int(np.count_nonzero(crossings == -2))
+
+
+count_crossings = crossing_kernel if NUMBA_AVAILABLE else crossing_numpy
+
+
+def warmup():
+    """Run the crossing kernel once on dummy data so the first real frame is not the first call"""
+    slots = np.zeros(1, np.int32)
+    centers = np.zeros((1, 2), np.int32)
+    count_crossings(slots, centers, 1, 0, np.full(1, -1, np.int32), np.zeros(1, np.int8),
+                    np.empty(1, np.int8))
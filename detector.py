@@ -1,34 +1,307 @@
+import os
+import importlib.util
 import cv2
+import numpy as np
 from ultralytics import YOLO
 
+try:
+    import torch
+    import torch.nn.functional as F
+    CUDA_AVAILABLE = torch.cuda.is_available()
+except ImportError:
+    CUDA_AVAILABLE = False
+
+try:
+    import onnxruntime as ort
+    ORT_AVAILABLE = True
+except ImportError:
+    ORT_AVAILABLE = False
+
+# Only needed for the CPU INT8 export, so the runtime itself is not imported here
+OPENVINO_AVAILABLE = importlib.util.find_spec("openvino") is not None
+
+ORT_IMGSZ = 640
+GPU_IMGSZ = 640  # Square network input used by the pinned-memory upload path
+PAD_VALUE = 114  # Letterbox border colour, same as ultralytics
+NMS_IOU = 0.7  # Same default IoU threshold as ultralytics
+MOTION_SIZE = (160, 90)  # Frame size the motion check runs at
+
+class MotionGate:
+    """Cheap frame-differencing check that decides whether a frame is worth running the detector on"""
+    def __init__(self, pixel_threshold=15, min_pixels=500, max_skip=15):
+        self.pixel_threshold = pixel_threshold
+        self.min_pixels = min_pixels
+        # Longest gap between detections, in camera frames, even in a still scene. Kept well
+        # below the trackers' max_age (30) so tracks of people standing still are not dropped.
+        self.max_skip = max_skip
+        self._reference = None  # Small grayscale copy of the last detected frame
+        self._last_index = 0  # Frame index of the last detection
+
+    def has_motion(self, frame, frame_index, stride=1):
+        """frame_index counts camera frames; stride is how many frames pass until the next check"""
+        # Shrink before the colour conversion so both run on a few thousand pixels
+        small = cv2.resize(frame, MOTION_SIZE, interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+
+        # Detect now if skipping would leave the next chance past max_skip frames
+        if self._reference is None or frame_index + stride - self._last_index > self.max_skip:
+            motion = True
+        else:
+            # Compared against the last detected frame, so slow changes still add up
+            diff = cv2.absdiff(self._reference, gray)
+            _, changed = cv2.threshold(diff, self.pixel_threshold, 255, cv2.THRESH_BINARY)
+            motion = cv2.countNonZero(changed) >= self.min_pixels
+
+        if motion:
+            self._reference = gray
+            self._last_index = frame_index
+        return motion
+
 class PersonDetector:
-    def __init__(self, model_path="yolov8n.pt", confidence=0.5):
+    def __init__(self, model_path="yolov8n.pt", confidence=0.5, optimize=True,
+                 int8=False, calib_data="calib.yaml", batch_size=1):
         try:
-            self.model = YOLO(model_path)
             self.confidence = confidence
-            print(f"Model loaded successfully: {model_path}")
+            self.batch_size = max(1, int(batch_size))
+            self.int8 = int8
+            self.model_path = model_path
+            self.model = YOLO(model_path)
+
+            # Swap the PyTorch checkpoint for an exported engine when possible
+            if optimize and model_path.endswith(".pt"):
+                self.model = self._load_optimized_model(model_path, int8, calib_data)
+
+            # Only persons (class 0 in COCO dataset) are kept, filtered inside NMS
+            self._predict_kwargs = dict(verbose=False, classes=[0])
+
+            # Eager PyTorch fallback (no export): fold BatchNorm into the convolutions and run
+            # in FP16 on the GPU. Exported engines have their device and precision baked in.
+            if self.model_path.endswith(".pt"):
+                self.model.fuse()
+                if CUDA_AVAILABLE:
+                    self._predict_kwargs.update(device=0, half=True)
+
+            # ONNX models run through our own ONNX Runtime session
+            self._ort_session = None
+            if self.model_path.endswith(".onnx") and ORT_AVAILABLE:
+                self._init_ort_session(self.model_path)
+
+            # On CUDA, raw frames are staged in pinned host memory, copied asynchronously
+            # and letterboxed/normalized on the GPU (buffers sized on the first frame)
+            self._pinned = None
+            self._gpu_preprocess = CUDA_AVAILABLE and self._ort_session is None
+            if self._gpu_preprocess:
+                self._stream = torch.cuda.Stream()
+
+            print(f"Model loaded successfully: {self.model_path}")
         except Exception as e:
             print(f"Error loading model: {e}")
             raise
 
+    def _load_optimized_model(self, model_path, int8, calib_data):
+        """Load (exporting on first run) a TensorRT engine on GPU, an ONNX or OpenVINO model on CPU"""
+        base = os.path.splitext(model_path)[0]
+
+        if CUDA_AVAILABLE:
+            # Engines are built for a maximum batch size, so cache one file per batch/precision
+            suffix = ("-int8" if int8 else "") + (f"-b{self.batch_size}" if self.batch_size > 1 else "")
+            export_path = f"{base}{suffix}.engine"
+            export_args = dict(format="engine", half=True, device=0, dynamic=True,
+                               batch=self.batch_size, workspace=4)
+            if int8:
+                # INT8 calibration needs a dataset yaml pointing at representative frames
+                export_args.update(int8=True, data=calib_data)
+        elif int8 and OPENVINO_AVAILABLE:
+            # INT8 on CPU: OpenVINO quantizes with the same calibration data and runs on
+            # VNNI/AMX dot-product instructions. The export is a directory, not a file.
+            export_path = f"{base}_int8_openvino_model"
+            export_args = dict(format="openvino", int8=True, data=calib_data)
+        else:
+            # No NVIDIA GPU - TensorRT is unavailable, ONNX Runtime is the faster CPU backend
+            export_path = f"{base}.onnx"
+            export_args = dict(format="onnx", dynamic=True, simplify=True)
+
+        try:
+            if not os.path.exists(export_path):
+                print(f"Exporting {model_path} to {export_args['format']} (one-time step)...")
+                exported = self.model.export(**export_args)
+                if exported and exported != export_path:
+                    os.replace(exported, export_path)
+
+            self.model_path = export_path
+            return YOLO(export_path, task="detect")
+        except Exception as e:
+            print(f"Model export failed, using {model_path}: {e}")
+            return self.model
+
+    def _init_ort_session(self, onnx_path):
+        """Create an ONNX Runtime session restricted to a single CUDA stream"""
+        # One inference request is in flight at a time, so the CUDA EP does not
+        # need extra streams (less GPU memory and synchronization)
+        providers = ["CPUExecutionProvider"]
+        if "CUDAExecutionProvider" in ort.get_available_providers():
+            providers.insert(0, ("CUDAExecutionProvider", {"device_id": 0, "use_single_stream": True}))
+
+        try:
+            self._ort_session = ort.InferenceSession(onnx_path, providers=providers)
+        except Exception as e:
+            print(f"Single-stream CUDA session unavailable, using defaults: {e}")
+            self._ort_session = ort.InferenceSession(onnx_path)
+
+        self._ort_input_name = self._ort_session.get_inputs()[0].name
+        # Preallocated input tensor and letterbox canvas, reused for every frame
+        self._ort_input = np.empty((1, 3, ORT_IMGSZ, ORT_IMGSZ), np.float32)
+        self._letterbox = np.empty((ORT_IMGSZ, ORT_IMGSZ, 3), np.uint8)
+        self._letterbox_frame_size = None  # Frame size the canvas geometry was set up for
+
+    def detect_ort(self, frame):
+        """Detect persons with the ONNX Runtime session"""
+        h, w = frame.shape[:2]
+
+        # Letterbox: resize keeping aspect ratio, pad to a square canvas. The geometry, the
+        # padding and the resize buffer only change with the frame size.
+        if self._letterbox_frame_size != (h, w):
+            scale = min(ORT_IMGSZ / h, ORT_IMGSZ / w)
+            nw, nh = int(round(w * scale)), int(round(h * scale))
+            left, top = (ORT_IMGSZ - nw) // 2, (ORT_IMGSZ - nh) // 2
+            self._letterbox.fill(PAD_VALUE)
+            self._ort_resized = np.empty((nh, nw, 3), np.uint8)
+            self._letterbox_geometry = (scale, nw, nh, left, top)
+            self._letterbox_frame_size = (h, w)
+        scale, nw, nh, left, top = self._letterbox_geometry
+
+        cv2.resize(frame, (nw, nh), dst=self._ort_resized, interpolation=cv2.INTER_LINEAR)
+        self._letterbox[top:top + nh, left:left + nw] = self._ort_resized
+
+        # BGR->RGB, HWC->CHW and 0-255 -> 0-1 straight into the input tensor. Colour and
+        # normalization run after the resize so they touch 640x640 pixels, not the full frame.
+        np.divide(self._letterbox[..., ::-1].transpose(2, 0, 1), 255.0, out=self._ort_input[0])
+
+        # Output is (1, 4 + classes, anchors): cx, cy, w, h then per-class scores
+        preds = self._ort_session.run(None, {self._ort_input_name: self._ort_input})[0][0]
+        scores = preds[4]  # Person is class 0 in COCO dataset
+        keep = scores >= self.confidence
+        if not np.any(keep):
+            return []
+
+        cx, cy, bw, bh = preds[:4, keep]
+        scores = scores[keep]
+        x1 = (cx - bw / 2 - left) / scale
+        y1 = (cy - bh / 2 - top) / scale
+        boxes_wh = np.stack([x1, y1, bw / scale, bh / scale], axis=1)
+
+        indices = cv2.dnn.NMSBoxes(boxes_wh.tolist(), scores.tolist(), self.confidence, NMS_IOU)
+        detections = []
+        for i in np.array(indices).reshape(-1):
+            x, y, bw_i, bh_i = boxes_wh[i]
+            x1_i, y1_i = max(0, int(x)), max(0, int(y))
+            x2_i, y2_i = min(w, int(x + bw_i)), min(h, int(y + bh_i))
+
+            # Ensure valid bounding box
+            if x2_i > x1_i and y2_i > y1_i:
+                detections.append(([x1_i, y1_i, x2_i, y2_i], float(scores[i]), "person"))
+        return detections
+
+    def _alloc_pinned(self, batch, h, w):
+        """Allocate the persistent pinned uint8 frame buffer and the device-side tensors"""
+        self._pinned = torch.empty((batch, h, w, 3), dtype=torch.uint8).pin_memory()
+        self._pinned_np = self._pinned.numpy()  # Shares memory with the pinned tensor
+        self._gpu_frames = torch.empty((batch, h, w, 3), dtype=torch.uint8, device="cuda")
+        # Network input, pre-filled with the letterbox border; only the image area is rewritten
+        self._gpu_input = torch.full((batch, 3, GPU_IMGSZ, GPU_IMGSZ), PAD_VALUE / 255.0,
+                                     dtype=torch.float16, device="cuda")
+
+        # Letterbox geometry is fixed for a given frame size
+        gain = min(GPU_IMGSZ / h, GPU_IMGSZ / w)
+        nh, nw = int(round(h * gain)), int(round(w * gain))
+        top, left = (GPU_IMGSZ - nh) // 2, (GPU_IMGSZ - nw) // 2
+        self._letterbox_size = (nh, nw)
+        self._letterbox_offset = (top, left)
+        self._letterbox_transform = (1 / gain, left, top)
+
+    def _upload(self, frames):
+        """Copy raw frames to the GPU asynchronously and letterbox/normalize them there"""
+        n = len(frames)
+        h, w = frames[0].shape[:2]
+        if self._pinned is None or n > self._pinned.shape[0] or self._pinned.shape[1:3] != (h, w):
+            self._alloc_pinned(max(n, self.batch_size), h, w)
+
+        # Only a plain uint8 memcpy happens on the CPU
+        for i, frame in enumerate(frames):
+            self._pinned_np[i] = frame
+
+        # Copy and preprocess on a side stream; the default stream (inference) waits for it
+        nh, nw = self._letterbox_size
+        top, left = self._letterbox_offset
+        with torch.cuda.stream(self._stream):
+            gpu_frames = self._gpu_frames[:n]
+            gpu_frames.copy_(self._pinned[:n], non_blocking=True)
+            # NHWC uint8 -> NCHW half, resized to the letterbox area
+            x = F.interpolate(gpu_frames.permute(0, 3, 1, 2).half(), size=(nh, nw),
+                              mode="bilinear", align_corners=False)
+            # BGR->RGB and 0-255 -> 0-1 into the persistent input tensor, on the resized image
+            dst = self._gpu_input[:n, :, top:top + nh, left:left + nw]
+            torch.mul(x.flip(1), 1 / 255.0, out=dst)
+        torch.cuda.current_stream().wait_stream(self._stream)
+        return self._gpu_input[:n]
+
     def detect(self, frame):
+        if self._ort_session is not None:
+            try:
+                return self.detect_ort(frame)
+            except Exception as e:
+                print(f"Error in detection: {e}")
+                return []
+
+        if self._gpu_preprocess:
+            return self.detect_batch([frame])[0]
+
         try:
-            results = self.model(frame, verbose=False)[0]
-            detections = []
-            
-            if results.boxes is not None:
-                for box in results.boxes:
-                    # Check if detection is a person (class 0 in COCO dataset)
-                    if int(box.cls[0]) == 0 and float(box.conf[0]) >= self.confidence:
-                        x1, y1, x2, y2 = map(int, box.xyxy[0].tolist())
-                        conf = float(box.conf[0])
-                        
-                        # Ensure valid bounding box
-                        if x2 > x1 and y2 > y1:
-                            detections.append(([x1, y1, x2, y2], conf, "person"))
-            
-            return detections
-            
+            results = self.model(frame, conf=self.confidence, **self._predict_kwargs)[0]
+            return self._parse_results(results)
+
         except Exception as e:
             print(f"Error in detection: {e}")
-            return []
\ No newline at end of file
+            return []
+
+    def detect_batch(self, frames):
+        """Run one forward pass over several frames, returning detections per frame"""
+        if self._ort_session is not None:
+            return [self.detect(frame) for frame in frames]
+
+        try:
+            if self._gpu_preprocess:
+                # Tensor input skips ultralytics' own preprocessing; boxes come back
+                # in letterboxed network coordinates and are mapped back to the frame
+                results = self.model(self._upload(frames), conf=self.confidence, **self._predict_kwargs)
+                return [self._parse_results(r, self._letterbox_transform) for r in results]
+
+            results = self.model(list(frames), conf=self.confidence, **self._predict_kwargs)
+            return [self._parse_results(r) for r in results]
+
+        except Exception as e:
+            print(f"Error in batch detection: {e}")
+            return [[] for _ in frames]
+
+    def _parse_results(self, results, transform=None):
+        """Convert a single ultralytics result into (bbox, confidence, class) tuples"""
+        boxes = results.boxes
+        if boxes is None or len(boxes) == 0:
+            return []
+
+        # Class and confidence were already filtered by the predictor's NMS. One
+        # device->host copy of the (N, 6) x1, y1, x2, y2, conf, cls tensor (FP16 engines widened first)
+        data = boxes.data.float().cpu().numpy()
+        xyxy = data[:, :4]
+        if transform is not None:
+            # Undo the letterbox: remove the padding offset, then the resize gain
+            inv_gain, left, top = transform
+            xyxy = (xyxy - np.array([left, top, left, top], xyxy.dtype)) * inv_gain
+        xyxy = xyxy.astype(np.int32)
+        confs = data[:, 4]
+
+        # Ensure valid bounding boxes
+        valid = (xyxy[:, 2] > xyxy[:, 0]) & (xyxy[:, 3] > xyxy[:, 1])
+
+        return [(bbox, conf, "person")
+                for bbox, conf in zip(xyxy[valid].tolist(), confs[valid].tolist())]
@@ -1,25 +1,101 @@
 import sys
-import cv2
+import gc
 import json
 import os
+import importlib
+import importlib.util
 import time
 import math
+import tempfile
+import collections
+import concurrent.futures
+import functools
+import numpy as np
 from datetime import datetime
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QLabel, QVBoxLayout, QHBoxLayout, 
     QPushButton, QSpinBox, QSlider, QComboBox, QGroupBox, QFileDialog,
     QMessageBox, QStatusBar, QMenuBar, QMenu, QStyle, QSplashScreen,
-    QProgressBar, QDialog
+    QProgressBar, QDialog, QGraphicsOpacityEffect, QCheckBox
 )
-from PyQt6.QtCore import Qt, QTimer, QThread, pyqtSignal, QRect, QPointF
+from PyQt6.QtCore import Qt, QTimer, QThread, QObject, QMutex, QMutexLocker, pyqtSignal, QRect, QPointF
 from PyQt6.QtGui import QImage, QPixmap, QAction, QPainter, QFont, QBrush, QLinearGradient, QConicalGradient, QColor
 
+class LazyModule:
+    """Module proxy that defers the real import until the first attribute access"""
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+# OpenCV (and capture, which imports it) are only needed once the camera starts,
+# so they are kept out of the import path that paints the splash screen
+cv2 = LazyModule("cv2")
+capture = LazyModule("capture")
+
+# Set OPTICAL_EAGER_IMPORT=1 to load the AI modules behind the splash screen
+# at startup instead of on the first Start click (handy for debugging import errors)
+EAGER_IMPORT = os.environ.get("OPTICAL_EAGER_IMPORT") == "1"
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def dump_json(data, indent=False):
+    """Serialize data to JSON bytes, with orjson when it is installed"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else 0)
+    if indent:
+        return json.dumps(data, indent=2).encode()
+    return json.dumps(data, separators=(',', ':')).encode()
+
+def write_json_atomic(path, data, indent=False):
+    """Write data as JSON to a temp file and swap it in, so path is never half-written"""
+    payload = dump_json(data, indent)
+
+    directory = os.path.dirname(path) or '.'
+    tmp_path = None
+    try:
+        with tempfile.NamedTemporaryFile('wb', dir=directory, prefix='.tmp.', delete=False) as f:
+            tmp_path = f.name
+            f.write(payload)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        print(f"Failed to write {path}: {e}")
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
 # Global variables to store imported modules
 detector_module = None
 tracker_module = None
 counter_module = None
 visualizer_module = None
 
+def load_module(module_name):
+    """Import an AI module on first use and cache it in its *_module global"""
+    global_name = f"{module_name}_module"
+    module = globals()[global_name]
+    if module is None:
+        try:
+            module = importlib.import_module(module_name)
+            globals()[global_name] = module
+            print(f"✓ {module_name} module loaded")
+        except ImportError as e:
+            print(f"✗ {module_name} module not found: {e}")
+        except Exception as e:
+            print(f"✗ Error loading {module_name}: {e}")
+    return module
+
+def module_available(module_name):
+    """Check that an AI module can be imported without importing it"""
+    return globals()[f"{module_name}_module"] is not None or importlib.util.find_spec(module_name) is not None
+
 class ModuleLoaderThread(QThread):
     """Thread for loading AI modules in the background"""
     progress_updated = pyqtSignal(int, str)
@@ -35,36 +111,26 @@ class ModuleLoaderThread(QThread):
         ]
     
     def run(self):
-        global detector_module, tracker_module, counter_module, visualizer_module
-        
         for i, (name, module_name) in enumerate(self.modules_to_load):
             self.progress_updated.emit(25 * (i + 1), f"Loading {name} module")
-            
-            try:
-                module = __import__(module_name)
-                
-                # Assign to the appropriate global variable
-                if module_name == "detector":
-                    detector_module = module
-                elif module_name == "tracker":
-                    tracker_module = module
-                elif module_name == "counter":
-                    counter_module = module
-                elif module_name == "visualizer":
-                    visualizer_module = module
-                    
-                print(f"✓ {name} module loaded")
-                
-            except ImportError as e:
-                print(f"✗ {name} module not found: {e}")
-            except Exception as e:
-                print(f"✗ Error loading {name}: {e}")
-            
-            # Small delay to show progress
-            time.sleep(0.1)
+            load_module(module_name)
         
         self.modules_loaded.emit()
 
+# Generation-0 GC threshold while counting (CPython's default is 700), so young
+# collections don't land in the middle of most frames
+GC_GEN0_THRESHOLD = 20000
+
+# Splash background, decoded once per process and shared by every splash instance
+SPLASH_IMAGE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "human-eye.jpg")
+_splash_bg = None
+
+def splash_background():
+    global _splash_bg
+    if _splash_bg is None:
+        _splash_bg = QPixmap(SPLASH_IMAGE)
+    return _splash_bg
+
 class EnhancedSplashScreen(QSplashScreen):
     """Enhanced attractive splash screen"""
     def __init__(self):
@@ -73,44 +139,51 @@ class EnhancedSplashScreen(QSplashScreen):
         super().__init__(pixmap)
         self.setWindowFlag(Qt.WindowType.WindowStaysOnTopHint)
 
-        self.background = QPixmap("human-eye.jpg")
+        self.background = splash_background()
         self.active = True  # Track if the splash screen is active
 
+        # Background, overlay and titles never change: render them once
+        self._static_cache = self._build_static_cache()
+        # Only the bottom strip (loading text, progress bar) is repainted
+        self._dynamic_rect = QRect(0, self.height() - 80, self.width(), 80)
+
         # Progress tracking
         self.progress = 0
         self.message = "Loading..."
 
-        # Animation timer for smooth effects
+        # Animation timer for the loading dots (not vsync'd, so no point going faster)
         self.timer = QTimer()
         self.timer.timeout.connect(self.update_animation)
-        self.timer.start(30)  # Update every 30ms
+        self.timer.start(50)  # Update every 50ms
         self.animation_step = 0
+        self._dot_count = 0
 
     def update_progress(self, progress, message=""):
         if not self.active:
             return
+        # Nothing to repaint if the same step is reported twice
+        if progress == self.progress and (not message or message == self.message):
+            return
         self.progress = progress
         if message:
             self.message = message
-        self.repaint()
+        self.update(self._dynamic_rect)
         QApplication.processEvents()
 
     def update_animation(self):
         if not self.active:
             return
         self.animation_step += 1
-        self.repaint()
-
-    def paintEvent(self, event):
-        if not self.active:
-            return
-            
-        painter = QPainter(self)
-        if not painter.isActive():
-            # Try to begin painting
-            if not painter.begin(self):
-                return
-        
+        # Repaint only when the number of dots actually changes
+        dot_count = (self.animation_step // 5) % 4
+        if dot_count != self._dot_count:
+            self._dot_count = dot_count
+            self.update(self._dynamic_rect)
+
+    def _build_static_cache(self):
+        """Render the background, overlay and titles into a pixmap"""
+        cache = QPixmap(self.size())
+        painter = QPainter(cache)
         try:
             painter.setRenderHint(QPainter.RenderHint.Antialiasing)
 
@@ -155,9 +228,26 @@ class EnhancedSplashScreen(QSplashScreen):
             # Main subtitle
             painter.setPen(QColor(225, 225, 225))
             painter.drawText(subtitle_rect, Qt.AlignmentFlag.AlignCenter, subtitle_text)
+        finally:
+            painter.end()
+        return cache
+
+    def paintEvent(self, event):
+        if not self.active:
+            return
+            
+        painter = QPainter(self)
+        if not painter.isActive():
+            # Try to begin painting
+            if not painter.begin(self):
+                return
+        
+        try:
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+            painter.drawPixmap(0, 0, self._static_cache)
 
             # Animated loading text
-            dots = "." * ((self.animation_step // 8) % 4)
+            dots = "." * self._dot_count
             loading_text = f"{self.message}{dots}"
             painter.setFont(QFont("Arial", 9))
 
@@ -226,6 +316,24 @@ class EnhancedSplashScreen(QSplashScreen):
 
 class CameraLoadingDialog(QDialog):
     """Enhanced camera loading dialog with attractive animations"""
+    # One full pulse cycle, precomputed as (opacity, icon pixel size) per tick. 126 ticks
+    # hold exactly 4 size and 3 opacity periods (about the old 0.2 and 0.15 rad/tick)
+    PULSE_STEPS = 126
+    PULSE_TABLE = [((150 + 105 * math.sin(2 * math.pi * 3 * i / PULSE_STEPS)) / 255.0,
+                    int(24 * (1.0 + 0.1 * math.sin(2 * math.pi * 4 * i / PULSE_STEPS))))
+                   for i in range(PULSE_STEPS)]
+    ICON_STYLE = """
+        QLabel {
+            background-color: #3498db;
+            border-radius: 40px;
+            color: white;
+            border: 3px solid rgba(52, 152, 219, 100);
+            font-family: Arial;
+            font-weight: bold;
+            font-size: %dpx;
+        }
+    """
+
     def __init__(self, parent=None, settings=None):
         super().__init__(parent)
         self.settings = settings or {}
@@ -244,16 +352,14 @@ class CameraLoadingDialog(QDialog):
         self.icon_label = QLabel()
         self.icon_label.setFixedSize(80, 80)
         self.icon_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.icon_label.setStyleSheet("""
-            QLabel {
-                background-color: #3498db;
-                border-radius: 40px;
-                color: white;
-                font-size: 24px;
-                font-weight: bold;
-            }
-        """)
         self.icon_label.setText("📹")
+        # The theme's QLabel rule would override a plain QFont, so the size stays in the
+        # label's own sheet. One sheet per pulse size is built here; animating only swaps them.
+        self._icon_sheets = {size: self.ICON_STYLE % size for _, size in self.PULSE_TABLE}
+        self._icon_size = self.PULSE_TABLE[0][1]
+        self.icon_label.setStyleSheet(self._icon_sheets[self._icon_size])
+        self._icon_effect = QGraphicsOpacityEffect(self.icon_label)
+        self.icon_label.setGraphicsEffect(self._icon_effect)
         
         # Center the icon
         icon_layout = QHBoxLayout()
@@ -311,16 +417,15 @@ class CameraLoadingDialog(QDialog):
         animation_layout = QHBoxLayout()
         animation_layout.setSpacing(10)
         
-        # Create animated dots
+        # Create animated dots. Their look comes from the dialog's style sheet; animating
+        # only flips the "active" property, so no sheet is parsed per tick
         self.dots = []
         for i in range(5):
             dot = QLabel("●")
+            dot.setObjectName("loadingDot")
             dot.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            dot.setStyleSheet("""
-                font-size: 16px; 
-                color: #3498db; 
-                margin: 5px;
-            """)
+            dot.setContentsMargins(5, 5, 5, 5)
+            dot.setProperty("active", False)
             self.dots.append(dot)
             animation_layout.addWidget(dot)
         
@@ -352,53 +457,52 @@ class CameraLoadingDialog(QDialog):
                 border-radius: 15px;
                 border: 2px solid #3498db;
             }
+            QLabel#loadingDot {
+                color: #555;
+                font-size: 16px;
+            }
+            QLabel#loadingDot[active="true"] {
+                color: #3498db;
+                font-size: 18px;
+                font-weight: bold;
+            }
         """)
         
     def animate_dots(self):
         """Animate the loading dots"""
-        # Reset all dots
-        for dot in self.dots:
-            dot.setStyleSheet("""
-                font-size: 16px; 
-                color: #555; 
-                margin: 5px;
-            """)
-        
+        if not self.dots:
+            return
+
+        # Only the previously highlighted dot needs resetting
+        self._set_dot_active(self.dots[self.dot_index - 1], False)
+
         # Highlight current dot
-        if self.dots:
-            self.dots[self.dot_index].setStyleSheet("""
-                font-size: 18px; 
-                color: #3498db; 
-                margin: 5px;
-                font-weight: bold;
-            """)
-        
+        self._set_dot_active(self.dots[self.dot_index], True)
+
         self.dot_index = (self.dot_index + 1) % len(self.dots)
         
+    def _set_dot_active(self, dot, active):
+        """Flip a dot's "active" property and re-apply the matching style sheet rule"""
+        dot.setProperty("active", active)
+        dot.style().unpolish(dot)
+        dot.style().polish(dot)
+
     def animate_icon(self):
         """Animate the camera icon with pulsing effect"""
-        scale_factor = 1.0 + 0.1 * math.sin(self.icon_scale * 0.2)
-        self.icon_scale += 1
+        self.icon_scale = (self.icon_scale + 1) % self.PULSE_STEPS
         
         # Create pulsing effect
-        alpha = int(150 + 105 * math.sin(self.icon_scale * 0.15))
-        self.icon_label.setStyleSheet(f"""
-            QLabel {{
-                background-color: rgba(52, 152, 219, {alpha});
-                border-radius: 40px;
-                color: white;
-                font-size: {int(24 * scale_factor)}px;
-                font-weight: bold;
-                border: 3px solid rgba(52, 152, 219, 100);
-            }}
-        """)
+        opacity, pixel_size = self.PULSE_TABLE[self.icon_scale]
+        self._icon_effect.setOpacity(opacity)
+        if pixel_size != self._icon_size:
+            self._icon_size = pixel_size
+            self.icon_label.setStyleSheet(self._icon_sheets[pixel_size])
         
     def update_progress(self, value, message=""):
         """Update progress bar and status message"""
         self.progressBar.setValue(value)  # Fixed: Changed from progress_bar to progressBar
         if message:
             self.status_label.setText(message)
-        QApplication.processEvents()
         
     def closeEvent(self, event):
         """Clean up timers when closing"""
@@ -412,18 +516,19 @@ class CameraInitWorker(QThread):
     error_occurred = pyqtSignal(str)
     progress_updated = pyqtSignal(int, str)
     
-    def __init__(self, camera_index, settings):
+    def __init__(self, camera_index, settings, detector=None, tracker=None):
         super().__init__()
         self.camera_index = camera_index
         self.settings = settings
+        # Components kept from a previous session, reused instead of reloading the model
+        self.detector = detector
+        self.tracker = tracker
 
     def run(self):
-        global detector_module, tracker_module, counter_module, visualizer_module
-        
         try:
             # Step 1: Open camera
             self.progress_updated.emit(10, "Opening camera...")
-            cap = cv2.VideoCapture(self.camera_index)
+            cap = capture.open_camera(self.camera_index)
             
             # Add timeout for camera opening
             start_time = time.time()
@@ -432,78 +537,329 @@ class CameraInitWorker(QThread):
                 
             if not cap.isOpened():
                 # Try fallback camera index
-                cap = cv2.VideoCapture(0)  # Try default camera
+                cap = capture.open_camera(0)  # Try default camera
                 if not cap.isOpened():
                     self.error_occurred.emit("Could not open any camera")
                     return
             
             # Step 2: Configure camera
-            self.progress_updated.emit(30, "Configuring camera...")
-            cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+            self.progress_updated.emit(25, "Configuring camera...")
+            capture.configure_capture(cap, 640, 480, fps=30, fourcc=self.settings['fourcc'])
+
+            # Grab one frame here so the stream is already running when the feed starts
+            self.progress_updated.emit(35, "Starting camera stream...")
+            cap.grab()
             
             # Initialize AI components if available
-            detector = None
-            tracker = None
-            counter = None
-            visualizer = None
-            
-            # Step 3: Initialize detector
-            if detector_module:
+            components = {'detector': None, 'tracker': None, 'counter': None, 'visualizer': None}
+
+            # Batching only pays off where one forward pass serves the whole batch (CUDA);
+            # on CPU the detector loops frame by frame and batching would just add latency
+            detector_mod = load_module('detector')
+            batch_size = self.settings['batch_size'] if detector_mod and detector_mod.CUDA_AVAILABLE else 1
+
+            # A kept detector is reused unless its batch size or precision changed, a kept tracker
+            # only needs its tracks cleared
+            if (self.detector and self.detector.batch_size == batch_size
+                    and self.detector.int8 == self.settings['int8']):
+                self.progress_updated.emit(40, "Reusing detector...")
+                self.detector.confidence = self.settings['confidence']
+                components['detector'] = self.detector
+            if self.tracker:
                 try:
-                    self.progress_updated.emit(50, "Initializing detector...")
-                    detector = detector_module.PersonDetector(confidence=self.settings['confidence'])
+                    self.tracker.reset()
+                    components['tracker'] = self.tracker
                 except Exception as e:
-                    print(f"Error creating detector: {e}")
-            
-            # Step 4: Initialize tracker
-            if tracker_module:
+                    print(f"Error resetting tracker: {e}")
+
+            # Steps 3-6: build the remaining components (modules are imported here on first use)
+            steps = [
+                ('detector', 'PersonDetector', {'confidence': self.settings['confidence'],
+                                                'batch_size': batch_size,
+                                                'int8': self.settings['int8']}),
+                ('tracker', 'MultiObjectTracker', {}),
+                ('counter', 'PeopleCounter', {'line_position': self.settings['line_position'],
+                                              'direction': self.settings['direction'],
+                                              'max_capacity': self.settings['max_capacity']}),
+                ('visualizer', 'Visualizer', {'line_position': self.settings['line_position'],
+                                              'direction': self.settings['direction']}),
+            ]
+            for i, (name, class_name, kwargs) in enumerate(steps):
+                if components[name] is not None:
+                    continue
+                self.progress_updated.emit(40 + i * 15, f"Initializing {name}...")
+                module = load_module(name)
+                if module is None:
+                    continue
                 try:
-                    self.progress_updated.emit(65, "Initializing tracker...")
-                    tracker = tracker_module.MultiObjectTracker()
+                    components[name] = getattr(module, class_name)(**kwargs)
                 except Exception as e:
-                    print(f"Error creating tracker: {e}")
-            
-            # Step 5: Initialize counter
-            if counter_module:
-                try:
-                    self.progress_updated.emit(80, "Initializing counter...")
-                    counter = counter_module.PeopleCounter(
-                        line_position=self.settings['line_position'],
-                        direction=self.settings['direction'],
-                        max_capacity=self.settings['max_capacity']
-                    )
-                except Exception as e:
-                    print(f"Error creating counter: {e}")
-            
-            # Step 6: Initialize visualizer
-            if visualizer_module:
+                    print(f"Error creating {name}: {e}")
+
+            # Compile/load the numba crossing kernel now instead of on the first frame
+            if components['counter'] is not None:
                 try:
-                    self.progress_updated.emit(90, "Initializing visualizer...")
-                    visualizer = visualizer_module.Visualizer(
-                        line_position=self.settings['line_position'],
-                        direction=self.settings['direction']
-                    )
+                    self.progress_updated.emit(90, "Warming up JIT kernels...")
+                    importlib.import_module("counter_kernels").warmup()
                 except Exception as e:
-                    print(f"Error creating visualizer: {e}")
+                    print(f"Error warming up counter kernels: {e}")
             
             # Step 7: Finalize
             self.progress_updated.emit(95, "Finalizing...")
             
             # Package everything
-            camera_package = {
-                'cap': cap,
-                'detector': detector,
-                'tracker': tracker,
-                'counter': counter,
-                'visualizer': visualizer
-            }
+            camera_package = {'cap': cap, **components}
             
             self.camera_ready.emit(camera_package)
             
         except Exception as e:
             self.error_occurred.emit(f"Camera initialization failed: {str(e)}")
 
+class InferenceWorker(QObject):
+    """Runs capture, detection, tracking and counting off the GUI thread"""
+
+    def __init__(self, cap, detector, tracker, counter, visualizer, batch_size=1, det_stride=1,
+                 realtime_mode=True, use_opencl=False, motion_gate=False):
+        super().__init__()
+        self.cap = cap
+        self.detector = detector
+        self.tracker = tracker
+        self.counter = counter
+        self.visualizer = visualizer
+        # Main AI pipeline only runs if all modules are available; fixed for the worker's lifetime
+        self._ai_ready = bool(detector and tracker and counter)
+
+        # Frames are buffered and sent to the detector in one batched forward pass
+        self.frame_buf = collections.deque(maxlen=max(1, batch_size))
+        self.tracked_objects = load_module("tracker").TrackerResult.empty() if self._ai_ready else None
+
+        # Only every det_stride-th frame is sent to the detector; the tracker predicts the rest
+        self.det_stride = det_stride
+        self.frame_index = 0
+        # Frames that barely differ from the last detected one skip the detector as well
+        self.motion_gate = load_module("detector").MotionGate() if motion_gate and self._ai_ready else None
+
+        # Realtime mode drops frames the pipeline could not keep up with; otherwise all are processed
+        self.realtime_mode = realtime_mode
+        self.grabber = None
+
+        # Single-slot mailbox holding the newest finished frame for the GUI
+        self._mutex = QMutex()
+        self._latest = None
+        self._run = False
+
+        # Changes to the pipeline objects queued by the GUI thread, applied between frames.
+        # Results are stamped with the number of resets applied so older ones can be dropped.
+        self._commands = []
+        self._resets_submitted = 0
+        self._resets_applied = 0
+
+        # Size of the video widget; larger frames are shrunk to it before display
+        self.display_size = None
+        # Downscaled display buffers, each wrapped once by a QImage. Three are rotated so the
+        # one being written is never the one waiting in the mailbox or the one being painted
+        self._small_bufs = []
+        self._small_images = []
+        self._small_index = 0
+
+        # Resize on an OpenCL device through UMat when requested and available
+        self.use_opencl = use_opencl and cv2.ocl.haveOpenCL()
+        if self.use_opencl:
+            cv2.ocl.setUseOpenCL(True)
+
+    def run(self):
+        """Produce processed frames until stop() is called"""
+        self._run = True
+
+        # The grabber keeps draining the camera while a frame is being processed,
+        # so inference always starts from the newest frame
+        grabber = self.grabber = capture.FrameGrabber(self.cap, realtime=self.realtime_mode).start()
+        try:
+            while self._run:
+                self._run_commands()
+                stamp = self._resets_applied
+
+                ret, frame = grabber.read()
+                if not ret:
+                    if grabber.ended:
+                        print("Camera stream ended")
+                        break
+                    print("Failed to read frame")
+                    continue
+
+                frame, stats = self.process_frame(frame)
+                image, buf = self._to_qimage(frame, stats)
+
+                # Overwrite any frame the GUI has not picked up yet - stale frames are dropped.
+                # The array is passed along to keep the QImage's pixels alive.
+                with QMutexLocker(self._mutex):
+                    self._latest = (image, buf, stats, stamp)
+        finally:
+            grabber.stop()
+
+    def stop(self):
+        self._run = False
+
+    def submit(self, command, reset=False):
+        """Queue a callable that changes the counter, visualizer or detector.
+
+        It runs on the worker thread between two frames, never during one. With reset,
+        frames processed before the command ran are no longer handed to the GUI."""
+        with QMutexLocker(self._mutex):
+            self._commands.append((command, reset))
+            if reset:
+                self._resets_submitted += 1
+                self._latest = None
+
+    def _run_commands(self):
+        with QMutexLocker(self._mutex):
+            commands, self._commands = self._commands, []
+        for command, reset in commands:
+            try:
+                command()
+            except Exception as e:
+                print(f"Error applying setting: {e}")
+            if reset:
+                self._resets_applied += 1
+
+    def take_latest(self):
+        """Return the newest (QImage, pixel buffer, stats), or None if nothing new was produced"""
+        with QMutexLocker(self._mutex):
+            latest, self._latest = self._latest, None
+            if latest is not None and latest[3] < self._resets_submitted:
+                return None  # Produced before a reset the GUI has already shown
+        return latest[:3] if latest is not None else None
+
+    def _to_qimage(self, frame, stats=None):
+        """Wrap a BGR frame in a QImage for display, shrinking it to the widget size first.
+
+        Overlays are drawn after the shrink, so they only touch display-sized pixels."""
+        # Qt paints BGR888 directly, so no colour conversion (or its buffer) is needed
+        h, w, ch = frame.shape
+        scale = 1.0
+        if self.display_size:
+            scale = min(self.display_size[0] / w, self.display_size[1] / h)
+
+        if scale < 1.0:
+            w, h = max(1, int(w * scale)), max(1, int(h * scale))
+            if not self._small_bufs or self._small_bufs[0].shape[:2] != (h, w):
+                self._small_bufs = [np.empty((h, w, ch), np.uint8) for _ in range(3)]
+                self._small_images = [QImage(buf.data, w, h, ch * w, QImage.Format.Format_BGR888)
+                                      for buf in self._small_bufs]
+            self._small_index = (self._small_index + 1) % len(self._small_bufs)
+            buf = self._small_bufs[self._small_index]
+            if self.use_opencl:
+                # T-API: the resize runs as an OpenCL kernel, only the small image is read back
+                buf[...] = cv2.resize(cv2.UMat(frame), (w, h), interpolation=cv2.INTER_AREA).get()
+            else:
+                cv2.resize(frame, (w, h), dst=buf, interpolation=cv2.INTER_AREA)
+            image = self._small_images[self._small_index]
+        else:
+            # Full size: wrap the frame itself, nothing writes to it after processing. A frame
+            # still waiting in the batch buffer must not get the overlay burnt into it.
+            scale = 1.0
+            buf = frame.copy() if stats is not None and self.visualizer and self.frame_buf else frame
+            image = QImage(buf.data, w, h, ch * w, QImage.Format.Format_BGR888)
+
+        if stats is not None and self.visualizer:
+            self.visualizer.draw(buf, self.tracked_objects,
+                                 stats['count_in'], stats['count_out'],
+                                 stats['over_capacity'], stats['current_inside'], scale)
+        return image, buf
+
+    def process_frame(self, frame):
+        if not self._ai_ready:
+            return frame, None
+
+        try:
+            # Run detection once the batch buffer is full, then replay tracking per frame
+            self.frame_buf.append(frame)
+            if len(self.frame_buf) == self.frame_buf.maxlen:
+                batch = list(self.frame_buf)
+                self.frame_buf.clear()
+
+                stride = max(1, self.det_stride)
+                gate = self.motion_gate
+                detect_idx = [i for i in range(len(batch)) if (self.frame_index + i) % stride == 0
+                              and (gate is None or gate.has_motion(batch[i], self.frame_index + i, stride))]
+                self.frame_index += len(batch)
+                detections = {}
+                if detect_idx:
+                    detections = dict(zip(detect_idx, self.detector.detect_batch([batch[i] for i in detect_idx])))
+
+                for i, batch_frame in enumerate(batch):
+                    if i in detections:
+                        tracked_objects = self.tracker.update(batch_frame, detections[i])
+                    else:
+                        tracked_objects = self.tracker.predict(batch_frame)
+
+                    self.counter.update_batch(tracked_objects.ids, tracked_objects.bboxes)
+                    self.counter.cleanup_lost_tracks(tracked_objects.ids)
+
+                self.tracked_objects = tracked_objects
+
+            count_in, count_out = self.counter.get_counts()
+            over_capacity, current_inside = self.counter.is_over_capacity()
+            stats = {
+                'count_in': count_in,
+                'count_out': count_out,
+                'current_inside': current_inside,
+                'over_capacity': over_capacity,
+                'active_tracks': len(self.tracked_objects.ids),
+                'last_event': self.counter.recent_events[-1] if self.counter.recent_events else None
+            }
+
+            # The visualization is drawn in _to_qimage, on the display-sized image
+            return frame, stats
+
+        except Exception as e:
+            print(f"Error in AI pipeline: {e}")
+            # Continue with basic video display
+            return frame, None
+
+class VideoWidget(QWidget):
+    """Paints the current frame scaled to fit, keeping the aspect ratio"""
+    resized = pyqtSignal(int, int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._image = None
+        self._buf = None  # Pixel buffer behind _image, kept alive for later repaints
+        self._target = QRect()
+        # Every pixel is painted each frame, so Qt need not clear the background first
+        self.setAttribute(Qt.WidgetAttribute.WA_OpaquePaintEvent)
+
+    def set_image(self, image, buf):
+        """Show a QImage wrapping buf; it is drawn straight away since its buffer is reused by the worker"""
+        size_changed = self._image is None or image.size() != self._image.size()
+        self._image = image
+        self._buf = buf
+        if size_changed:
+            self._update_target()
+        self.repaint()
+
+    def _update_target(self):
+        if self._image is None:
+            return
+        size = self._image.size().scaled(self.size(), Qt.AspectRatioMode.KeepAspectRatio)
+        self._target = QRect((self.width() - size.width()) // 2, (self.height() - size.height()) // 2,
+                             size.width(), size.height())
+
+    def resizeEvent(self, event):
+        self._update_target()
+        self.resized.emit(self.width(), self.height())
+        super().resizeEvent(event)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        try:
+            painter.fillRect(self.rect(), QColor(0, 0, 0))
+            if self._image is not None:
+                # Scaling happens inside the paint; no intermediate pixmaps are created
+                painter.drawImage(self._target, self._image)
+        finally:
+            painter.end()
+
 class CameraPlaceholder(QWidget):
     """Animated placeholder with smooth radar scanner effect"""
     def __init__(self, parent=None):
@@ -568,6 +924,106 @@ class CameraPlaceholder(QWidget):
         super().closeEvent(event)
 
 
+# Themes (built once at import, shared by every window)
+DARK_THEME = """
+    QMainWindow { background-color: #2c3e50; }
+    QLabel { color: white; font-size: 13px; }
+    QGroupBox {
+        border: 2px solid #34495e;
+        border-radius: 8px;
+        margin-top: 10px;
+        color: #ecf0f1;
+        font-weight: bold;
+    }
+    QGroupBox::title {
+        subcontrol-origin: margin;
+        left: 10px;
+        padding: 0 5px;
+    }
+    QPushButton {
+        background-color: #3498db;
+        color: white;
+        font-weight: bold;
+        border-radius: 6px;
+        padding: 8px;
+    }
+    QPushButton:hover { background-color: #2980b9; }
+    QPushButton:pressed { background-color: #1f618d; }
+    QComboBox, QSlider {
+        background-color: #34495e;
+        color: white;
+        border-radius: 4px;
+        padding: 4px;
+    }
+
+    QSpinBox {
+        background-color: #34495e;
+        color: white;
+        border: 1px solid #2c3e50;
+        border-radius: 4px;
+        padding-right: 15px; /* make space for the buttons */
+    }
+
+    QStatusBar { background-color: #34495e; color: white; }
+"""
+
+LIGHT_THEME = """
+    QMainWindow { background-color: #ecf0f1; }
+    QLabel { color: black; font-size: 13px; }
+    QGroupBox {
+        border: 2px solid #bdc3c7;
+        border-radius: 8px;
+        margin-top: 10px;
+        color: #2c3e50;
+        font-weight: bold;
+    }
+    QGroupBox::title {
+        subcontrol-origin: margin;
+        left: 10px;
+        padding: 0 5px;
+    }
+    QPushButton {
+        background-color: #3498db;
+        color: white;
+        font-weight: bold;
+        border-radius: 6px;
+        padding: 8px;
+    }
+    QPushButton:hover { background-color: #2980b9; }
+    QPushButton:pressed { background-color: #1f618d; }
+    QComboBox, QSlider {
+        background-color: #ffffff;
+        color: black;
+        border-radius: 4px;
+        padding: 4px;
+    }
+
+    QSpinBox {
+        background-color: #34495e;
+        color: white;
+        border: 1px solid #2c3e50;
+        border-radius: 4px;
+        padding-right: 15px; /* make space for the buttons */
+    }
+
+    QStatusBar { background-color: #bdc3c7; color: black; }
+"""
+
+# Control buttons share one style sheet, selected by object name and the 'running' property
+BUTTONS_STYLE = """
+    QPushButton { color: white; font-weight: bold; }
+    QPushButton#startButton { background-color: #27ae60; }
+    QPushButton#startButton[running="true"] { background-color: #e74c3c; }
+    QPushButton#resetButton { background-color: #f39c12; }
+    QPushButton#exportButton { background-color: #3498db; }
+"""
+
+@functools.lru_cache(maxsize=16)
+def standard_icon(pixmap):
+    """Rasterize a standard style icon once and reuse it"""
+    return QApplication.style().standardIcon(pixmap)
+
+
 class PeopleCounterApp(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -583,8 +1039,17 @@ class PeopleCounterApp(QMainWindow):
         self.tracker = None
         self.counter = None
         self.visualizer = None
+        self.inference_thread = None
+        self.inference_worker = None
+        self._pending_camera_package = None
         self.session_start_time = None
 
+        self._shown_stats = None  # Last values written to the stat labels
+        self._shown_elapsed = None
+
+        # Collector thresholds in effect before counting started, restored when it stops
+        self._gc_threshold = None
+
         # Settings (default)
         self.settings = {
             'camera_index': 0,
@@ -592,6 +1057,13 @@ class PeopleCounterApp(QMainWindow):
             'line_position': 240,
             'direction': 'horizontal',
             'confidence': 0.4,
+            'batch_size': 1,  # Frames per detector call; only used on CUDA, CPU always runs 1
+            'det_stride': 2,
+            'realtime_mode': True,
+            'int8': False,  # INT8 TensorRT engine, or OpenVINO on CPU (needs calib.yaml); FP16 otherwise
+            'motion_gate': True,  # Skip detection while the scene is still
+            'use_opencl': False,  # Display resize through OpenCV's T-API (OpenCL, e.g. integrated GPUs)
+            'fourcc': "MJPG",  # Camera pixel format; "" keeps the driver default (usually YUYV)
             'line_color': (0, 0, 255),
             'auto_save': True,
             'save_interval': 60,
@@ -600,90 +1072,14 @@ class PeopleCounterApp(QMainWindow):
         self.last_save = time.time()
         self.load_settings()
 
-        # Themes
-        self.dark_theme = """
-            QMainWindow { background-color: #2c3e50; }
-            QLabel { color: white; font-size: 13px; }
-            QGroupBox {
-                border: 2px solid #34495e;
-                border-radius: 8px;
-                margin-top: 10px;
-                color: #ecf0f1;
-                font-weight: bold;
-            }
-            QGroupBox::title {
-                subcontrol-origin: margin;
-                left: 10px;
-                padding: 0 5px;
-            }
-            QPushButton {
-                background-color: #3498db;
-                color: white;
-                font-weight: bold;
-                border-radius: 6px;
-                padding: 8px;
-            }
-            QPushButton:hover { background-color: #2980b9; }
-            QPushButton:pressed { background-color: #1f618d; }
-            QComboBox, QSlider {
-                background-color: #34495e;
-                color: white;
-                border-radius: 4px;
-                padding: 4px;
-            }
-
-            QSpinBox {
-                background-color: #34495e;
-                color: white;
-                border: 1px solid #2c3e50;
-                border-radius: 4px;
-                padding-right: 15px; /* make space for the buttons */
-            }
-
-            QStatusBar { background-color: #34495e; color: white; }
-        """
-
-        self.light_theme = """
-            QMainWindow { background-color: #ecf0f1; }
-            QLabel { color: black; font-size: 13px; }
-            QGroupBox {
-                border: 2px solid #bdc3c7;
-                border-radius: 8px;
-                margin-top: 10px;
-                color: #2c3e50;
-                font-weight: bold;
-            }
-            QGroupBox::title {
-                subcontrol-origin: margin;
-                left: 10px;
-                padding: 0 5px;
-            }
-            QPushButton {
-                background-color: #3498db;
-                color: white;
-                font-weight: bold;
-                border-radius: 6px;
-                padding: 8px;
-            }
-            QPushButton:hover { background-color: #2980b9; }
-            QPushButton:pressed { background-color: #1f618d; }
-            QComboBox, QSlider {
-                background-color: #ffffff;
-                color: black;
-                border-radius: 4px;
-                padding: 4px;
-            }
+        # Settings changes are coalesced into one write shortly after the last change
+        self._save_timer = QTimer(self)
+        self._save_timer.setSingleShot(True)
+        self._save_timer.setInterval(500)
+        self._save_timer.timeout.connect(self.save_settings)
 
-            QSpinBox {
-                background-color: #34495e;
-                color: white;
-                border: 1px solid #2c3e50;
-                border-radius: 4px;
-                padding-right: 15px; /* make space for the buttons */
-            }
-
-            QStatusBar { background-color: #bdc3c7; color: black; }
-        """
+        # File writes run on a single background thread, in submission order
+        self._io_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
 
         # Initialize UI
         self.init_ui()
@@ -694,6 +1090,7 @@ class PeopleCounterApp(QMainWindow):
         self.current_inside = 0
         self.active_tracks = 0
         self.over_capacity = False
+        self.last_event = None
 
         # Apply saved theme
         self.change_theme(self.settings.get("theme", "Dark"))
@@ -715,31 +1112,23 @@ class PeopleCounterApp(QMainWindow):
         layout.addWidget(self.video_label, 3)
 
 
-        # --- Control panel ---
-        controls = QVBoxLayout()
-        layout.addLayout(controls, 1)
-
-        controls.addWidget(self.create_settings_group())
-        controls.addWidget(self.create_stats_group())
-        controls.addWidget(self.create_buttons_group())
-        controls.addStretch(1)
+        # --- Control panel (filled in right after the window is first shown) ---
+        self._controls = QVBoxLayout()
+        layout.addLayout(self._controls, 1)
+        self._controls_built = False
 
         # Status bar
         self.status = QStatusBar()
         self.setStatusBar(self.status)
         
         # Check module availability
-        modules_available = sum([
-            detector_module is not None,
-            tracker_module is not None,
-            counter_module is not None,
-            visualizer_module is not None
-        ])
+        modules_available = sum(module_available(name)
+                                for name in ("detector", "tracker", "counter", "visualizer"))
         
         if modules_available == 4:
-            self.status.showMessage("Ready - All AI modules loaded")
+            self.status.showMessage("Ready - All AI modules available")
         elif modules_available > 0:
-            self.status.showMessage(f"Ready - {modules_available}/4 AI modules loaded (limited functionality)")
+            self.status.showMessage(f"Ready - {modules_available}/4 AI modules available (limited functionality)")
         else:
             self.status.showMessage("Ready - No AI modules loaded (camera only)")
 
@@ -752,6 +1141,19 @@ class PeopleCounterApp(QMainWindow):
         
         print("UI setup complete!")
 
+    def showEvent(self, event):
+        """Build the control panel on the event-loop tick after the first show"""
+        super().showEvent(event)
+        if not self._controls_built:
+            self._controls_built = True
+            QTimer.singleShot(0, self._build_control_panel)
+
+    def _build_control_panel(self):
+        self._controls.addWidget(self.create_settings_group())
+        self._controls.addWidget(self.create_stats_group())
+        self._controls.addWidget(self.create_buttons_group())
+        self._controls.addStretch(1)
+
     def create_settings_group(self):
         group = QGroupBox("Settings")
         vbox = QVBoxLayout(group)
@@ -769,8 +1171,11 @@ class PeopleCounterApp(QMainWindow):
         self.line_slider = QSlider(Qt.Orientation.Horizontal)
         self.line_slider.setRange(50, 600)
         self.line_slider.setValue(self.settings['line_position'])
-        self.line_slider.valueChanged.connect(self.update_line_position)
-        vbox.addWidget(QLabel("Line Position:"))
+        # While dragging only the label follows; the value is committed on release
+        self.line_slider.valueChanged.connect(self.on_line_slider_moved)
+        self.line_slider.sliderReleased.connect(self.update_line_position)
+        self.line_label = QLabel(f"Line Position: {self.settings['line_position']}")
+        vbox.addWidget(self.line_label)
         vbox.addWidget(self.line_slider)
 
         # Direction
@@ -785,10 +1190,34 @@ class PeopleCounterApp(QMainWindow):
         self.conf_slider = QSlider(Qt.Orientation.Horizontal)
         self.conf_slider.setRange(1, 9)
         self.conf_slider.setValue(int(self.settings['confidence'] * 10))
-        self.conf_slider.valueChanged.connect(self.update_confidence)
-        vbox.addWidget(QLabel("Detection Confidence:"))
+        self.conf_slider.valueChanged.connect(self.on_conf_slider_moved)
+        self.conf_slider.sliderReleased.connect(self.update_confidence)
+        self.conf_label = QLabel(f"Detection Confidence: {self.settings['confidence']:.1f}")
+        vbox.addWidget(self.conf_label)
         vbox.addWidget(self.conf_slider)
 
+        # Detection stride
+        stride_layout = QHBoxLayout()
+        stride_layout.addWidget(QLabel("Detect every:"))
+
+        self.stride_spin = QSpinBox()
+        self.stride_spin.setRange(1, 10)
+        self.stride_spin.setValue(self.settings['det_stride'])
+        self.stride_spin.valueChanged.connect(self.update_det_stride)
+        self.stride_spin.setSuffix(" frames")
+        stride_layout.addWidget(self.stride_spin)
+
+        stride_layout.addStretch()
+        vbox.addLayout(stride_layout)
+
+        # INT8 model precision (TensorRT on GPU, OpenVINO on CPU); the detector is rebuilt
+        # with it on the next camera start
+        self.int8_check = QCheckBox("INT8 model (needs calib.yaml)")
+        self.int8_check.setChecked(self.settings['int8'])
+        self.int8_check.setToolTip("Applied the next time counting starts; the first start exports the model")
+        self.int8_check.toggled.connect(self.update_int8)
+        vbox.addWidget(self.int8_check)
+
         # Auto-save interval
         auto_save_layout = QHBoxLayout()
         auto_save_layout.addWidget(QLabel("Auto-save every:"))
@@ -823,9 +1252,12 @@ class PeopleCounterApp(QMainWindow):
         self.lbl_tracks = QLabel("Active Tracks: 0")
         self.lbl_status = QLabel("Status: Normal")
         self.lbl_session = QLabel("Session Time: 00:00:00")
+        self.lbl_last_event = QLabel("Last Crossing: -")
 
-        for lbl in [self.lbl_in, self.lbl_out, self.lbl_inside, self.lbl_tracks, self.lbl_status, self.lbl_session]:
-            lbl.setStyleSheet("font-size: 12px;")
+        # One selector for all labels instead of a style sheet per label
+        group.setStyleSheet("QGroupBox QLabel { font-size: 12px; }")
+        for lbl in [self.lbl_in, self.lbl_out, self.lbl_inside, self.lbl_tracks, self.lbl_status, self.lbl_session,
+                    self.lbl_last_event]:
             vbox.addWidget(lbl)
 
         return group
@@ -833,33 +1265,41 @@ class PeopleCounterApp(QMainWindow):
     def create_buttons_group(self):
         group = QGroupBox("Controls")
         vbox = QVBoxLayout(group)
+        group.setStyleSheet(BUTTONS_STYLE)
 
         # Start/Stop button
         self.start_button = QPushButton(" Start Counting")
-        self.start_button.setIcon(self.style().standardIcon(QStyle.StandardPixmap.SP_MediaPlay))
+        self.start_button.setIcon(standard_icon(QStyle.StandardPixmap.SP_MediaPlay))
         self.start_button.setToolTip("Start people counting")
-        self.start_button.setStyleSheet("background-color: #27ae60; color: white; font-weight: bold;")
+        self.start_button.setObjectName("startButton")
         self.start_button.clicked.connect(self.toggle_counting)
         vbox.addWidget(self.start_button)
 
         # Reset button
         self.reset_button = QPushButton(" Reset Counts")
-        self.reset_button.setIcon(self.style().standardIcon(QStyle.StandardPixmap.SP_BrowserReload))
+        self.reset_button.setIcon(standard_icon(QStyle.StandardPixmap.SP_BrowserReload))
         self.reset_button.setToolTip("Reset all counts")
-        self.reset_button.setStyleSheet("background-color: #f39c12; color: white; font-weight: bold;")
+        self.reset_button.setObjectName("resetButton")
         self.reset_button.clicked.connect(self.reset_counts)
         vbox.addWidget(self.reset_button)
 
         # Export button
         self.export_button = QPushButton(" Export Data")
-        self.export_button.setIcon(self.style().standardIcon(QStyle.StandardPixmap.SP_DialogSaveButton))
+        self.export_button.setIcon(standard_icon(QStyle.StandardPixmap.SP_DialogSaveButton))
         self.export_button.setToolTip("Export session data")
-        self.export_button.setStyleSheet("background-color: #3498db; color: white; font-weight: bold;")
+        self.export_button.setObjectName("exportButton")
         self.export_button.clicked.connect(self.export_data)
         vbox.addWidget(self.export_button)
 
         return group
 
+    def _set_start_button_running(self, running):
+        """Switch the start button colour through its 'running' property"""
+        self.start_button.setProperty("running", running)
+        # Re-match the group's selectors; the style sheet itself is not re-parsed
+        self.start_button.style().unpolish(self.start_button)
+        self.start_button.style().polish(self.start_button)
+
     def create_menu(self):
         menubar = QMenuBar(self)
         self.setMenuBar(menubar)
@@ -871,6 +1311,12 @@ class PeopleCounterApp(QMainWindow):
         export_action.triggered.connect(self.export_data)
         file_menu.addAction(export_action)
 
+        realtime_action = QAction("Real-time Mode (drop late frames)", self)
+        realtime_action.setCheckable(True)
+        realtime_action.setChecked(self.settings['realtime_mode'])
+        realtime_action.toggled.connect(self.update_realtime_mode)
+        file_menu.addAction(realtime_action)
+
         exit_action = QAction("Exit", self)
         exit_action.triggered.connect(self.close)
         file_menu.addAction(exit_action)
@@ -882,46 +1328,99 @@ class PeopleCounterApp(QMainWindow):
         help_menu.addAction(about_action)
 
     # ---------------- Settings Updates ----------------
+    def _apply_to_pipeline(self, command, reset=False):
+        """Run a change to the counter/visualizer/detector on the thread that uses them"""
+        if self.inference_worker:
+            self.inference_worker.submit(command, reset)
+        else:
+            command()
+
     def update_max_capacity(self):
         self.settings['max_capacity'] = self.capacity_spin.value()
         if self.counter:
-            self.counter.max_capacity = self.settings['max_capacity']
-        self.save_settings()
+            counter, max_capacity = self.counter, self.settings['max_capacity']
+            self._apply_to_pipeline(lambda: setattr(counter, 'max_capacity', max_capacity))
+        self._schedule_save()
+
+    def on_line_slider_moved(self, value):
+        self.line_label.setText(f"Line Position: {value}")
+        # Keyboard and wheel changes have no release, commit them right away
+        if not self.line_slider.isSliderDown():
+            self.update_line_position()
+
+    def on_conf_slider_moved(self, value):
+        self.conf_label.setText(f"Detection Confidence: {value / 10.0:.1f}")
+        if not self.conf_slider.isSliderDown():
+            self.update_confidence()
 
     def update_line_position(self):
         self.settings['line_position'] = self.line_slider.value()
         if self.counter and self.visualizer:
-            self.counter.line_position = self.settings['line_position']
-            self.visualizer.line_position = self.settings['line_position']
-        self.save_settings()
+            counter, visualizer, line_position = self.counter, self.visualizer, self.settings['line_position']
+
+            def apply():
+                counter.line_position = line_position
+                visualizer.line_position = line_position
+            self._apply_to_pipeline(apply)
+        self._schedule_save()
 
     def update_direction(self):
         self.settings['direction'] = self.direction_combo.currentText()
         if self.counter and self.visualizer:
-            self.counter.direction = self.settings['direction']
-            self.visualizer.direction = self.settings['direction']
-        self.save_settings()
+            counter, visualizer, direction = self.counter, self.visualizer, self.settings['direction']
+
+            def apply():
+                counter.direction = direction
+                visualizer.direction = direction
+            self._apply_to_pipeline(apply)
+        self._schedule_save()
 
     def update_confidence(self):
         self.settings['confidence'] = self.conf_slider.value() / 10.0
         if self.detector:
-            self.detector.confidence = self.settings['confidence']
-        self.save_settings()
+            detector, confidence = self.detector, self.settings['confidence']
+            self._apply_to_pipeline(lambda: setattr(detector, 'confidence', confidence))
+        self._schedule_save()
+
+    def update_det_stride(self):
+        self.settings['det_stride'] = self.stride_spin.value()
+        if self.inference_worker:
+            worker, stride = self.inference_worker, self.settings['det_stride']
+            self._apply_to_pipeline(lambda: setattr(worker, 'det_stride', stride))
+        self._schedule_save()
+
+    def update_int8(self, enabled):
+        self.settings['int8'] = enabled
+        self._schedule_save()
+
+    def update_realtime_mode(self, enabled):
+        self.settings['realtime_mode'] = enabled
+        if self.inference_worker:
+            worker = self.inference_worker
+
+            def set_realtime():
+                # The grabber is created when the worker starts, so it is looked up here
+                worker.realtime_mode = enabled
+                if worker.grabber:
+                    worker.grabber.realtime = enabled
+
+            self._apply_to_pipeline(set_realtime)
+        self._schedule_save()
 
     def update_auto_save_interval(self):
         """Update the auto-save interval setting"""
         self.settings['save_interval'] = self.auto_save_spin.value()
-        self.save_settings()
+        self._schedule_save()
         self.status.showMessage(f"Auto-save interval set to {self.settings['save_interval']} seconds")
 
     def change_theme(self, theme_name):
         if theme_name == "Dark":
-            self.setStyleSheet(self.dark_theme)
+            self.setStyleSheet(DARK_THEME)
             self.settings["theme"] = "Dark"
         else:
-            self.setStyleSheet(self.light_theme)
+            self.setStyleSheet(LIGHT_THEME)
             self.settings["theme"] = "Light"
-        self.save_settings()
+        self._schedule_save()
 
     # ---------------- Camera and Counting Logic ----------------
     def toggle_counting(self):
@@ -943,22 +1442,35 @@ class PeopleCounterApp(QMainWindow):
         self.status.showMessage("Initializing camera system...")
         
         # Start camera initialization in background
-        self.camera_worker = CameraInitWorker(self.settings['camera_index'], self.settings)
-        self.camera_worker.progress_updated.connect(self.camera_loading_dialog.update_progress)
-        self.camera_worker.camera_ready.connect(self.on_camera_ready)
-        self.camera_worker.error_occurred.connect(self.on_camera_error)
+        self.camera_worker = CameraInitWorker(self.settings['camera_index'], self.settings,
+                                              detector=self.detector, tracker=self.tracker)
+        # Worker signals are always queued: the slots run on the GUI thread's event loop,
+        # which also paints the dialog, so no processEvents() is needed in them
+        queued = Qt.ConnectionType.QueuedConnection
+        self.camera_worker.progress_updated.connect(self.camera_loading_dialog.update_progress, queued)
+        self.camera_worker.camera_ready.connect(self.on_camera_ready, queued)
+        self.camera_worker.error_occurred.connect(self.on_camera_error, queued)
         self.camera_worker.start()
 
     def on_camera_ready(self, camera_package):
         """Called when camera and AI components are ready"""
         print("Camera ready!")
         
-        # Close loading dialog with a slight delay for smooth UX
+        # Show the completion message briefly for smooth UX, without blocking the event loop
+        self._pending_camera_package = camera_package
         if self.camera_loading_dialog:
-            # Show completion message briefly
             self.camera_loading_dialog.update_progress(100, "Launching camera feed...")
-            QApplication.processEvents()
-            time.sleep(0.3)
+            QTimer.singleShot(300, self._finish_camera_ready)
+        else:
+            self._finish_camera_ready()
+
+    def _finish_camera_ready(self):
+        """Close the loading dialog and start the session with the prepared components"""
+        camera_package, self._pending_camera_package = self._pending_camera_package, None
+        if camera_package is None:
+            return
+
+        if self.camera_loading_dialog:
             self.camera_loading_dialog.close()
             self.camera_loading_dialog = None
         
@@ -969,9 +1481,7 @@ class PeopleCounterApp(QMainWindow):
         self.counter = camera_package['counter']
         self.visualizer = camera_package['visualizer']
         
-        new_label = QLabel()
-        new_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        new_label.setStyleSheet("background-color: black;")
+        new_label = VideoWidget()
         self.video_label.deleteLater()
         self.video_label = new_label
         self.centralWidget().layout().insertWidget(0, self.video_label, 3)
@@ -982,8 +1492,8 @@ class PeopleCounterApp(QMainWindow):
         
         # Update UI
         self.start_button.setText(" Stop Counting")
-        self.start_button.setIcon(self.style().standardIcon(QStyle.StandardPixmap.SP_MediaStop))
-        self.start_button.setStyleSheet("background-color: #e74c3c; color: white; font-weight: bold;")
+        self.start_button.setIcon(standard_icon(QStyle.StandardPixmap.SP_MediaStop))
+        self._set_start_button_running(True)
         self.start_button.setEnabled(True)
         
         # Check if AI modules are available
@@ -998,9 +1508,35 @@ class PeopleCounterApp(QMainWindow):
             if not self.visualizer: missing.append("visualizer")
             self.status.showMessage(f"🟡 Counting active - Missing: {', '.join(missing)}")
         
+        # Capture and inference run on their own thread; the GUI only displays results
+        self.inference_thread = QThread()
+        self.inference_worker = InferenceWorker(self.cap, self.detector, self.tracker,
+                                                self.counter, self.visualizer,
+                                                batch_size=self.detector.batch_size if self.detector else 1,
+                                                det_stride=self.settings['det_stride'],
+                                                realtime_mode=self.settings['realtime_mode'],
+                                                use_opencl=self.settings['use_opencl'],
+                                                motion_gate=self.settings['motion_gate'])
+        self.inference_worker.display_size = (self.video_label.width(), self.video_label.height())
+        self.video_label.resized.connect(self.on_video_resized)
+        self.inference_worker.moveToThread(self.inference_thread)
+        self.inference_thread.started.connect(self.inference_worker.run)
+        self.inference_thread.start()
+
+        # Startup objects are moved out of the collector's reach, and young collections
+        # run far less often; automatic GC stays on so older generations are still swept
+        gc.collect()
+        gc.freeze()
+        self._gc_threshold = gc.get_threshold()
+        gc.set_threshold(GC_GEN0_THRESHOLD, *self._gc_threshold[1:])
+
         # Start video timer
         self.timer.start(30)  # 30ms = ~33 FPS
 
+    def on_video_resized(self, width, height):
+        if self.inference_worker:
+            self.inference_worker.display_size = (width, height)
+
     def on_camera_error(self, error_message):
         """Called when camera initialization fails"""
         print(f"Camera error: {error_message}")
@@ -1028,6 +1564,18 @@ class PeopleCounterApp(QMainWindow):
         
         self.is_running = False
         self.timer.stop()
+        if self._gc_threshold:
+            gc.set_threshold(*self._gc_threshold)
+            self._gc_threshold = None
+        gc.unfreeze()
+
+        # Stop the inference loop before releasing the camera it reads from
+        if self.inference_worker:
+            self.inference_worker.stop()
+            self.inference_thread.quit()
+            self.inference_thread.wait()
+            self.inference_worker = None
+            self.inference_thread = None
         
         if self.cap:
             self.cap.release()
@@ -1035,8 +1583,8 @@ class PeopleCounterApp(QMainWindow):
         
         # Reset UI
         self.start_button.setText(" Start Counting")
-        self.start_button.setIcon(self.style().standardIcon(QStyle.StandardPixmap.SP_MediaPlay))
-        self.start_button.setStyleSheet("background-color: #27ae60; color: white; font-weight: bold;")
+        self.start_button.setIcon(standard_icon(QStyle.StandardPixmap.SP_MediaPlay))
+        self._set_start_button_running(False)
         self.status.showMessage("Stopped")
         
         # Recreate animated placeholder when stopping
@@ -1048,38 +1596,22 @@ class PeopleCounterApp(QMainWindow):
 
 
     def update_frame(self):
-        if not self.cap or not self.is_running:
+        if not self.inference_worker or not self.is_running:
             return
-            
-        ret, frame = self.cap.read()
-        if not ret:
-            print("Failed to read frame")
+
+        latest = self.inference_worker.take_latest()
+        if latest is None:
             return
+        image, buf, stats = latest
 
-        # Main AI pipeline - only if all modules are available
-        if all([self.detector, self.tracker, self.counter]):
-            try:
-                detections = self.detector.detect(frame)
-                tracked_objects = self.tracker.update(frame, detections)
-
-                active_ids = [obj["id"] for obj in tracked_objects]
-                for obj in tracked_objects:
-                    self.counter.check_crossing(obj["id"], obj["bbox"])
-                self.counter.cleanup_lost_tracks(active_ids)
-
-                # Update stats
-                self.count_in, self.count_out = self.counter.get_counts()
-                self.over_capacity, self.current_inside = self.counter.is_over_capacity()
-                self.active_tracks = len(tracked_objects)
-
-                # Draw visualization
-                if self.visualizer:
-                    frame = self.visualizer.draw(frame, tracked_objects,
-                                                 self.count_in, self.count_out,
-                                                 self.over_capacity, self.current_inside)
-            except Exception as e:
-                print(f"Error in AI pipeline: {e}")
-                # Continue with basic video display
+        # Update stats
+        if stats:
+            self.count_in = stats['count_in']
+            self.count_out = stats['count_out']
+            self.current_inside = stats['current_inside']
+            self.over_capacity = stats['over_capacity']
+            self.active_tracks = stats['active_tracks']
+            self.last_event = stats['last_event']
 
         # Auto-save functionality
         current_time = time.time()
@@ -1089,37 +1621,45 @@ class PeopleCounterApp(QMainWindow):
             self.auto_save_data()
             self.last_save = current_time
 
-        # Convert frame to Qt format and display
+        # Display the frame (already wrapped in a QImage by the worker)
         try:
-            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            h, w, ch = rgb.shape
-            qt_img = QImage(rgb.data, w, h, ch * w, QImage.Format.Format_RGB888)
-            pixmap = QPixmap.fromImage(qt_img)
-            
-            # Scale to fit label while maintaining aspect ratio
-            scaled_pixmap = pixmap.scaled(
-                self.video_label.width(), self.video_label.height(),
-                Qt.AspectRatioMode.KeepAspectRatio,
-                Qt.TransformationMode.SmoothTransformation
-            )
-            self.video_label.setPixmap(scaled_pixmap)
+            self.video_label.set_image(image, buf)
         except Exception as e:
             print(f"Error displaying frame: {e}")
 
-        # Update UI stats
-        self.lbl_in.setText(f"People Entered: {self.count_in}")
-        self.lbl_out.setText(f"People Exited: {self.count_out}")
-        self.lbl_inside.setText(f"Currently Inside: {self.current_inside}")
-        self.lbl_tracks.setText(f"Active Tracks: {self.active_tracks}")
-        self.lbl_status.setText("Status: OVER CAPACITY!" if self.over_capacity else "Status: Normal")
-        self.lbl_status.setStyleSheet("color: red;" if self.over_capacity else "color: green;")
+        # Update UI stats, only touching the labels when a value changed
+        shown = (self.count_in, self.count_out, self.current_inside, self.active_tracks, self.over_capacity,
+                 self.last_event)
+        if shown != self._shown_stats:
+            self._update_stat_labels(shown)
 
-        # Session time
+        # Session time (changes once per second)
         if self.session_start_time:
-            elapsed = int(time.time() - self.session_start_time)
-            h_, rem = divmod(elapsed, 3600)
-            m_, s_ = divmod(rem, 60)
-            self.lbl_session.setText(f"Session Time: {h_:02d}:{m_:02d}:{s_:02d}")
+            elapsed = int(current_time - self.session_start_time)
+            if elapsed != self._shown_elapsed:
+                self._shown_elapsed = elapsed
+                h_, rem = divmod(elapsed, 3600)
+                m_, s_ = divmod(rem, 60)
+                self.lbl_session.setText(f"Session Time: {h_:02d}:{m_:02d}:{s_:02d}")
+
+    def _update_stat_labels(self, shown):
+        count_in, count_out, current_inside, active_tracks, over_capacity, last_event = shown
+        prev = self._shown_stats or (None,) * 6
+        if count_in != prev[0]:
+            self.lbl_in.setText(f"People Entered: {count_in}")
+        if count_out != prev[1]:
+            self.lbl_out.setText(f"People Exited: {count_out}")
+        if current_inside != prev[2]:
+            self.lbl_inside.setText(f"Currently Inside: {current_inside}")
+        if active_tracks != prev[3]:
+            self.lbl_tracks.setText(f"Active Tracks: {active_tracks}")
+        if over_capacity != prev[4]:
+            self.lbl_status.setText("Status: OVER CAPACITY!" if over_capacity else "Status: Normal")
+            self.lbl_status.setStyleSheet("color: red;" if over_capacity else "color: green;")
+        if last_event and last_event != prev[5]:
+            track_id, event = last_event
+            self.lbl_last_event.setText(f"Last Crossing: ID {track_id} {event}")
+        self._shown_stats = shown
 
     # ---------------- Data Management ----------------
     def reset_counts(self):
@@ -1130,9 +1670,11 @@ class PeopleCounterApp(QMainWindow):
         )
         if reply == QMessageBox.StandardButton.Yes:
             if self.counter:
-                self.counter.reset_counts()
+                # Frames counted before the reset are dropped instead of repainting old totals
+                self._apply_to_pipeline(self.counter.reset_counts, reset=True)
             self.count_in = self.count_out = self.current_inside = self.active_tracks = 0
             self.over_capacity = False
+            self.last_event = None
             
             # Update UI
             self.lbl_in.setText("People Entered: 0")
@@ -1141,6 +1683,8 @@ class PeopleCounterApp(QMainWindow):
             self.lbl_tracks.setText("Active Tracks: 0")
             self.lbl_status.setText("Status: Normal")
             self.lbl_status.setStyleSheet("color: green;")
+            self.lbl_last_event.setText("Last Crossing: -")
+            self._shown_stats = None
             
             QMessageBox.information(self, "Reset", "All counts have been reset.")
 
@@ -1165,11 +1709,11 @@ class PeopleCounterApp(QMainWindow):
                     'current_inside': self.current_inside,
                     'session_duration': int(time.time() - self.session_start_time)
                 },
-                'settings': self.settings
+                'settings': dict(self.settings)
             }
             
-            with open(filename, "w") as f:
-                json.dump(data, f, indent=4)
+            # Snapshot taken above; the write itself happens off the GUI thread
+            self._io_executor.submit(write_json_atomic, filename, data)
                 
             # Show brief notification in status bar
             self.status.showMessage(f"Auto-saved to {filename}", 3000)  # Show for 3 seconds
@@ -1202,8 +1746,9 @@ class PeopleCounterApp(QMainWindow):
 
         try:
             if filename.lower().endswith(".json"):
-                with open(filename, "w") as f:
-                    json.dump(data, f, indent=4)
+                # Serialized in one go and written with a single call
+                with open(filename, "wb") as f:
+                    f.write(dump_json(data, indent=True))
             else:  # Save as TXT
                 with open(filename, "w") as f:
                     f.write("=== People Counter Report ===\n")
@@ -1227,19 +1772,22 @@ class PeopleCounterApp(QMainWindow):
     def load_settings(self):
         try:
             if os.path.exists('settings.json'):
-                with open('settings.json', 'r') as f:
-                    saved_settings = json.load(f)
-                    self.settings.update(saved_settings)
-                    print("Settings loaded successfully")
+                with open('settings.json', 'rb') as f:
+                    raw = f.read()
+                saved_settings = orjson.loads(raw) if ORJSON_AVAILABLE else json.loads(raw)
+                self.settings.update(saved_settings)
+                print("Settings loaded successfully")
         except Exception as e:
             print(f"Failed to load settings: {e}")
 
+    def _schedule_save(self):
+        """Save settings once slider drags and spinbox edits have settled"""
+        self._save_timer.start()
+
     def save_settings(self):
-        try:
-            with open('settings.json', 'w') as f:
-                json.dump(self.settings, f, indent=2)
-        except Exception as e:
-            print(f"Failed to save settings: {e}")
+        self._save_timer.stop()
+        # Settings stay indented so the file remains easy to edit by hand
+        self._io_executor.submit(write_json_atomic, 'settings.json', dict(self.settings), True)
 
     # ---------------- About & Closing ----------------
     def show_about(self):
@@ -1266,6 +1814,7 @@ Created for professional people counting applications.
         if self.is_running:
             self.stop_counting()
         self.save_settings()
+        self._io_executor.shutdown(wait=True)  # Flush pending writes before exiting
         event.accept()
 
 
@@ -1284,58 +1833,43 @@ def main():
     splash = EnhancedSplashScreen()
     splash.show()
     
-    # Load modules with attractive progress updates
+    # Progress only advances on real milestones - nothing waits on a timer
     splash.update_progress(5, "Initializing application")
-    QApplication.processEvents()
-    time.sleep(0.3)
-    
-    # Start module loading in background thread
-    splash.update_progress(15, "Loading modules in background")
-    QApplication.processEvents()
-    
-    # Create and start module loader thread
-    module_loader = ModuleLoaderThread()
-    module_loader.progress_updated.connect(splash.update_progress)
-    module_loader.modules_loaded.connect(lambda: splash.update_progress(70, "Modules loaded"))
-    module_loader.start()
-    
-    # Wait for module loading to complete
-    while module_loader.isRunning():
-        QApplication.processEvents()
-        time.sleep(0.1)
-    
-    splash.update_progress(75, "Setting up user interface")
-    QApplication.processEvents()
-    time.sleep(0.4)
-    
-    try:
-        main_window = PeopleCounterApp()
-        
-        splash.update_progress(100, "Ready!")
-        QApplication.processEvents()
-        time.sleep(0.5)
-        
-        # Show main window and safely close splash
-        main_window.show()
-        
-        # Disconnect all signals and safely close the splash
+    windows = []
+
+    def show_main_window():
+        """Build the main window once startup work is done, then swap it in for the splash"""
         try:
-            module_loader.progress_updated.disconnect()
-        except:
-            pass
+            splash.update_progress(75, "Setting up user interface")
+            main_window = PeopleCounterApp()
+            windows.append(main_window)  # Keep a reference for the lifetime of the app
             
-        splash.safe_close()
-        splash = None
-        
-        print("Application started successfully!")
-        
-    except Exception as e:
-        if splash:
+            splash.update_progress(100, "Ready!")
+            main_window.show()
             splash.safe_close()
-        print(f"Error starting application: {e}")
-        QMessageBox.critical(None, "Startup Error", 
-                           f"Failed to start application:\n{str(e)}\n\nCheck console for details.")
-        return 1
+            print("Application started successfully!")
+            
+        except Exception as e:
+            splash.safe_close()
+            print(f"Error starting application: {e}")
+            QMessageBox.critical(None, "Startup Error", 
+                               f"Failed to start application:\n{str(e)}\n\nCheck console for details.")
+            app.exit(1)
+    
+    # AI modules are imported when the camera starts, unless eager loading is requested
+    module_loader = None
+    if EAGER_IMPORT:
+        splash.update_progress(15, "Loading modules in background")
+        
+        # The splash keeps animating while the loader thread imports; the main
+        # window is built as soon as it finishes
+        module_loader = ModuleLoaderThread()
+        module_loader.progress_updated.connect(splash.update_progress)
+        module_loader.modules_loaded.connect(lambda: splash.update_progress(70, "Modules loaded"))
+        module_loader.finished.connect(show_main_window)
+        module_loader.start()
+    else:
+        QTimer.singleShot(0, show_main_window)
     
     # Run application
     try:
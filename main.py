@@ -1,21 +1,28 @@
 import cv2
 import sys
-from detector import PersonDetector
+from detector import PersonDetector, MotionGate
 from tracker import MultiObjectTracker
 from counter import PeopleCounter
 from visualizer import Visualizer
+from capture import open_camera, configure_capture, FrameGrabber
+
+# Run the detector on every DET_STRIDE-th frame; the tracker predicts the frames in between
+DET_STRIDE = 2
 
 def main():
     # Initialize video capture
-    cap = cv2.VideoCapture(0)  # webcam
+    cap = open_camera(0)  # webcam
     
     if not cap.isOpened():
         print("Error: Could not open webcam")
         return
     
-    # Set camera resolution (optional)
-    cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+    # Set camera resolution, MJPG format and frame rate (optional)
+    configure_capture(cap, 640, 480, fps=30)
+
+    # Frames are read on a background thread, so the camera wait overlaps with
+    # detection; only the newest frame is kept
+    grabber = FrameGrabber(cap, realtime=True).start()
     
     try:
         # Initialize components
@@ -26,34 +33,39 @@ def main():
         line_position = 240  # Horizontal line position (adjust based on your camera view)
         counter = PeopleCounter(line_position=line_position, direction="horizontal", max_capacity=10)
         visualizer = Visualizer(line_position=line_position, direction="horizontal")
+        motion_gate = MotionGate()
         
         frame_count = 0
         print("People counting system started. Press 'q' to quit, 'r' to reset counts.")
         print("Make sure people cross the RED horizontal line to be counted!")
         
         while True:
-            ret, frame = cap.read()
+            ret, frame = grabber.read()
             if not ret:
-                print("Error: Could not read frame")
-                break
+                if grabber.ended:
+                    print("Error: Could not read frame")
+                    break
+                # No frame yet (camera warming up or a short stall) - keep the window responsive
+                if cv2.pollKey() & 0xFF == ord("q"):
+                    print("Quitting...")
+                    break
+                continue
 
             frame_count += 1
             
-            # Detect people in the frame
-            detections = detector.detect(frame)
-            
-            # Update tracker
-            tracked_objects = tracker.update(frame, detections)
-            
-            # Get active track IDs for cleanup
-            active_track_ids = [obj["id"] for obj in tracked_objects]
+            # Detect people in the frame and update the tracker, or only
+            # advance the existing tracks on skipped or motionless frames
+            if (frame_count - 1) % DET_STRIDE == 0 and motion_gate.has_motion(frame, frame_count, DET_STRIDE):
+                detections = detector.detect(frame)
+                tracked_objects = tracker.update(frame, detections)
+            else:
+                tracked_objects = tracker.predict(frame)
             
             # Check for line crossings
-            for obj in tracked_objects:
-                counter.check_crossing(obj["id"], obj["bbox"])
+            counter.update_batch(tracked_objects.ids, tracked_objects.bboxes)
             
             # Cleanup lost tracks from counter memory
-            counter.cleanup_lost_tracks(active_track_ids)
+            counter.cleanup_lost_tracks(tracked_objects.ids)
             
             # Get current counts
             count_in, count_out = counter.get_counts()
@@ -69,8 +81,8 @@ def main():
             # Show frame
             cv2.imshow("People Counter & Tracker", frame)
             
-            # Handle key presses
-            key = cv2.waitKey(1) & 0xFF
+            # Handle key presses; pollKey returns at once instead of sleeping like waitKey(1)
+            key = cv2.pollKey() & 0xFF
             if key == ord("q"):
                 print("Quitting...")
                 break
@@ -85,6 +97,7 @@ def main():
         print(f"Error: {e}")
     finally:
         # Cleanup
+        grabber.stop()
         cap.release()
         cv2.destroyAllWindows()
         
@@ -4,11 +4,36 @@ try:
 except ImportError:
     print("Warning: deep_sort_realtime not available. Install with: pip install deep-sort-realtime")
     DEEPSORT_AVAILABLE = False
+
+try:
+    from scipy.optimize import linear_sum_assignment
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
     
 import cv2
+import collections
+import numpy as np
+from tracker_kernels import iou_matrix
+
+MIN_OVERLAP = 0.3  # Minimum IoU for a detection to continue a track
+BOX_DTYPE = np.int16  # Pixel coordinates fit easily, at half the bandwidth of int32
+
+class TrackerResult(collections.namedtuple("TrackerResult", ["ids", "bboxes", "confidences"])):
+    """Tracks of one frame as parallel arrays: ids (N,), xyxy bboxes (N, 4) int16, confidences (N,)"""
+    __slots__ = ()
+
+    @classmethod
+    def from_lists(cls, ids, bboxes, confidences):
+        return cls(np.array(ids), np.array(bboxes, BOX_DTYPE).reshape(-1, 4),
+                   np.array(confidences, np.float32))
+
+    @classmethod
+    def empty(cls):
+        return cls.from_lists([], [], [])
 
 class MultiObjectTracker:
-    def __init__(self, max_age=30, n_init=3):
+    def __init__(self, max_age=30, n_init=3, track_capacity=64):
         if DEEPSORT_AVAILABLE:
             self.tracker = DeepSort(max_age=max_age, n_init=n_init)
             self.use_deepsort = True
@@ -16,117 +41,141 @@ class MultiObjectTracker:
             # Fallback to simple tracking
             self.use_deepsort = False
             self.next_id = 1
-            self.tracks = {}
             self.max_age = max_age
+
+            # Per-track state kept as parallel arrays indexed by a slot number
+            self.track_ids = np.zeros(track_capacity, np.int64)
+            self.boxes = np.zeros((track_capacity, 4), BOX_DTYPE)  # Last matched xyxy box
+            self.confs = np.zeros(track_capacity, np.float32)
+            self.ages = np.zeros(track_capacity, np.int16)  # Frames since the last match
+            self.active = np.zeros(track_capacity, bool)
             print("Using simple tracking fallback")
 
+    def reset(self):
+        """Drop all tracks so the tracker can be reused for a new session"""
+        if self.use_deepsort:
+            self.tracker.delete_all_tracks()
+        else:
+            self.next_id = 1
+            self.active.fill(False)
+
     def update(self, frame, detections):
         if self.use_deepsort:
             return self._update_deepsort(frame, detections)
         else:
             return self._update_simple(frame, detections)
 
+    def predict(self, frame):
+        """Advance existing tracks one frame without new detections"""
+        if self.use_deepsort:
+            try:
+                # Kalman prediction only - no appearance embedding, no association
+                self.tracker.tracker.predict()
+                return self._collect_deepsort(self.tracker.tracker.tracks)
+            except Exception as e:
+                print(f"Error in DeepSORT prediction: {e}")
+                return TrackerResult.empty()
+        else:
+            # The overlap tracker has no motion model, so keep the last matched boxes
+            live = np.flatnonzero(self.active & (self.ages == 0))
+            return TrackerResult(self.track_ids[live], self.boxes[live], self.confs[live])
+
     def _update_deepsort(self, frame, detections):
         """Update using DeepSORT"""
         try:
             tracks = self.tracker.update_tracks(detections, frame=frame)
-            tracked_objects = []
-            
-            for track in tracks:
-                if not track.is_confirmed():
-                    continue
-
-                # Get tight bounding box from DeepSORT
-                l, t, r, b = track.to_ltrb()
-                
-                # Ensure valid coordinates
-                l, t, r, b = max(0, int(l)), max(0, int(t)), int(r), int(b)
-                
-                if r > l and b > t:  # Valid box
-                    tracked_objects.append({
-                        "id": track.track_id,
-                        "bbox": (l, t, r, b)
-                    })
-                    
-            return tracked_objects
+            return self._collect_deepsort(tracks)
             
         except Exception as e:
             print(f"Error in DeepSORT tracking: {e}")
-            return []
+            return TrackerResult.empty()
 
-    def _update_simple(self, frame, detections):
-        """Simple tracking fallback using overlap-based matching"""
-        tracked_objects = []
-        current_detections = [(det[0], det[1]) for det in detections]  # (bbox, conf)
+    def _collect_deepsort(self, tracks):
+        """Convert confirmed DeepSORT tracks to a TrackerResult"""
+        ids, bboxes, confs = [], [], []
         
-        # Simple overlap-based tracking
-        matched_tracks = []
-        for bbox, conf in current_detections:
-            x1, y1, x2, y2 = bbox
-            best_match = None
-            best_overlap = 0
+        for track in tracks:
+            if not track.is_confirmed():
+                continue
+
+            # Get tight bounding box from DeepSORT
+            l, t, r, b = track.to_ltrb()
             
-            # Find best matching existing track
-            for track_id, track_data in self.tracks.items():
-                if track_data['age'] > self.max_age:
-                    continue
-                    
-                tx1, ty1, tx2, ty2 = track_data['bbox']
-                overlap = self._calculate_overlap(bbox, track_data['bbox'])
-                
-                if overlap > best_overlap and overlap > 0.3:  # Minimum overlap threshold
-                    best_overlap = overlap
-                    best_match = track_id
+            # Ensure valid coordinates
+            l, t, r, b = max(0, int(l)), max(0, int(t)), int(r), int(b)
             
-            if best_match:
-                # Update existing track
-                self.tracks[best_match]['bbox'] = bbox
-                self.tracks[best_match]['age'] = 0
-                matched_tracks.append(best_match)
-                tracked_objects.append({
-                    "id": best_match,
-                    "bbox": bbox
-                })
-            else:
-                # Create new track
-                track_id = self.next_id
-                self.next_id += 1
-                self.tracks[track_id] = {
-                    'bbox': bbox,
-                    'age': 0
-                }
-                matched_tracks.append(track_id)
-                tracked_objects.append({
-                    "id": track_id,
-                    "bbox": bbox
-                })
-        
-        # Age unmatched tracks
-        for track_id in list(self.tracks.keys()):
-            if track_id not in matched_tracks:
-                self.tracks[track_id]['age'] += 1
-                if self.tracks[track_id]['age'] > self.max_age:
-                    del self.tracks[track_id]
-        
-        return tracked_objects
+            if r > l and b > t:  # Valid box
+                ids.append(track.track_id)
+                bboxes.append((l, t, r, b))
+                # Detection confidence of this frame's match; NaN for predicted-only tracks
+                conf = getattr(track, "det_conf", None)
+                confs.append(np.nan if conf is None else conf)
+                
+        return TrackerResult.from_lists(ids, bboxes, confs)
 
-    def _calculate_overlap(self, box1, box2):
-        """Calculate IoU (Intersection over Union) between two boxes"""
-        x1_1, y1_1, x2_1, y2_1 = box1
-        x1_2, y1_2, x2_2, y2_2 = box2
-        
-        # Calculate intersection
-        x1_i = max(x1_1, x1_2)
-        y1_i = max(y1_1, y1_2)
-        x2_i = min(x2_1, x2_2)
-        y2_i = min(y2_1, y2_2)
-        
-        if x2_i <= x1_i or y2_i <= y1_i:
-            return 0
-        
-        intersection = (x2_i - x1_i) * (y2_i - y1_i)
-        area1 = (x2_1 - x1_1) * (y2_1 - y1_1)
-        area2 = (x2_2 - x1_2) * (y2_2 - y1_2)
-        union = area1 + area2 - intersection
-        
-        return intersection / union if union > 0 else 0
\ No newline at end of file
+    def _assign(self, overlaps):
+        """Match detections (rows) to tracks (columns) on their IoU matrix.
+
+        Returns the matched track column per detection, -1 for unmatched detections."""
+        matches = np.full(overlaps.shape[0], -1, np.intp)
+        if overlaps.size == 0:
+            return matches
+
+        if SCIPY_AVAILABLE:
+            # Optimal one-to-one assignment maximizing total overlap; pairs below
+            # the threshold get a prohibitive cost and are dropped afterwards
+            cost = np.where(overlaps > MIN_OVERLAP, 1.0 - overlaps, 1e9)
+            rows, cols = linear_sum_assignment(cost)
+            keep = overlaps[rows, cols] > MIN_OVERLAP
+            matches[rows[keep]] = cols[keep]
+            return matches
+
+        # Greedy fallback: each detection takes its best matching track
+        best = overlaps.argmax(axis=1)
+        keep = overlaps[np.arange(len(best)), best] > MIN_OVERLAP
+        matches[keep] = best[keep]
+        return matches
+
+    def _new_slot(self):
+        """Allocate a slot for a new track id, growing the arrays when all are in use"""
+        free = np.flatnonzero(~self.active)
+        if len(free) == 0:
+            grow = len(self.active)
+            self.track_ids = np.concatenate([self.track_ids, np.zeros(grow, np.int64)])
+            self.boxes = np.concatenate([self.boxes, np.zeros((grow, 4), BOX_DTYPE)])
+            self.confs = np.concatenate([self.confs, np.zeros(grow, np.float32)])
+            self.ages = np.concatenate([self.ages, np.zeros(grow, np.int16)])
+            self.active = np.concatenate([self.active, np.zeros(grow, bool)])
+            free = [grow]
+        slot = free[0]
+        self.track_ids[slot] = self.next_id
+        self.next_id += 1
+        self.active[slot] = True
+        return slot
+
+    def _update_simple(self, frame, detections):
+        """Simple tracking fallback using overlap-based matching"""
+        det_boxes = np.array([det[0] for det in detections], BOX_DTYPE).reshape(-1, 4)
+        det_confs = np.array([det[1] for det in detections], np.float32)
+
+        # IoU of every detection against every live track, computed in one kernel call
+        live = np.flatnonzero(self.active)
+        overlaps = iou_matrix(det_boxes, self.boxes[live])
+
+        # Overlap-based tracking: matched detections continue their track, the rest start new ones
+        matches = self._assign(overlaps)
+        matched = matches >= 0
+        slots = np.empty(len(det_boxes), np.intp)
+        slots[matched] = live[matches[matched]]
+        for i in np.flatnonzero(~matched):
+            slots[i] = self._new_slot()
+
+        self.boxes[slots] = det_boxes
+        self.confs[slots] = det_confs
+
+        # Age unmatched tracks and drop the ones unseen for too long
+        self.ages[self.active] += 1
+        self.ages[slots] = 0
+        self.active &= self.ages <= self.max_age
+
+        return TrackerResult(self.track_ids[slots], self.boxes[slots], self.confs[slots])
@@ -0,0 +1,83 @@
+import os
+import numpy as np
+
+# Ahead-of-time compiled kernels, built with `python tracker_kernels.py`. Being a plain
+# extension module there is no JIT compile on the first frame. Without it the loops are
+# JIT-compiled by numba, or NumPy is used when numba is missing too.
+try:
+    from tracker_kernels_aot import iou_matrix as _iou_matrix_aot
+    AOT_AVAILABLE = True
+except ImportError:
+    AOT_AVAILABLE = False
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+def iou_loops(boxes_a, boxes_b):
+    """IoU of every box in boxes_a (N, 4) against every box in boxes_b (M, 4), as (N, M)"""
+    n = boxes_a.shape[0]
+    m = boxes_b.shape[0]
+    out = np.zeros((n, m), np.float32)
+    for i in range(n):
+        ax1, ay1, ax2, ay2 = boxes_a[i, 0], boxes_a[i, 1], boxes_a[i, 2], boxes_a[i, 3]
+        area_a = (ax2 - ax1) * (ay2 - ay1)
+        for j in range(m):
+            iw = min(ax2, boxes_b[j, 2]) - max(ax1, boxes_b[j, 0])
+            ih = min(ay2, boxes_b[j, 3]) - max(ay1, boxes_b[j, 1])
+            if iw <= 0 or ih <= 0:
+                continue
+            inter = iw * ih
+            union = area_a + (boxes_b[j, 2] - boxes_b[j, 0]) * (boxes_b[j, 3] - boxes_b[j, 1]) - inter
+            if union > 0:
+                out[i, j] = inter / union
+    return out
+
+
+def iou_numpy(boxes_a, boxes_b):
+    """Vectorized NumPy equivalent of iou_loops, used when the compiled module is missing"""
+    a = boxes_a[:, None, :]
+    b = boxes_b[None, :, :]
+    iw = np.clip(np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]), 0, None)
+    ih = np.clip(np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]), 0, None)
+    inter = iw * ih
+    union = ((a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+             + (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1]) - inter)
+    return np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+
+
+IOU_SIGNATURE = "f4[:, :](f4[:, :], f4[:, :])"
+
+if AOT_AVAILABLE:
+    _iou_kernel = _iou_matrix_aot
+elif NUMBA_AVAILABLE:
+    # Explicit signature: compiled when the module is imported (and cached on disk),
+    # so the first frame does not pay the JIT cost
+    _iou_kernel = njit(IOU_SIGNATURE, cache=True, fastmath=True, nogil=True)(iou_loops)
+else:
+    _iou_kernel = iou_numpy
+
+
+def iou_matrix(boxes_a, boxes_b):
+    """IoU matrix between two sets of xyxy boxes"""
+    boxes_a = np.ascontiguousarray(boxes_a, dtype=np.float32).reshape(-1, 4)
+    boxes_b = np.ascontiguousarray(boxes_b, dtype=np.float32).reshape(-1, 4)
+    return _iou_kernel(boxes_a, boxes_b)
+
+
+def build():
+    """Compile the kernels into the tracker_kernels_aot extension next to this file"""
+    from numba.pycc import CC
+
+    cc = CC("tracker_kernels_aot")
+    cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+    cc.export("iou_matrix", IOU_SIGNATURE)(iou_loops)
+    cc.compile()
+    print(f"Built tracker_kernels_aot in {cc.output_dir}")
+
+
+if __name__ == "__main__":
+    build()
@@ -1,16 +1,35 @@
 import cv2
+import numpy as np
+
+STATS_PANEL = (10, 10, 350, 100)  # x1, y1, x2, y2 of the statistics background
 
 class Visualizer:
     def __init__(self, line_position=300, direction="horizontal"):
         self.line_position = line_position
         self.direction = direction
 
-    def draw(self, frame, tracked_objects, count_in, count_out, over_capacity=False, current_inside=0):
+        # Static overlay (line, arrows, stats background) rendered once per layout
+        self._overlay_key = None
+        self._overlay = None
+        self._overlay_mask = None
+        self._overlay_rois = []
+        self._labels_under_panel = False
+
+        # Stats text, re-rendered only when one of the numbers changes
+        self._stats_key = None
+        self._stats_text = None
+        self._stats_mask = None
+
+    def draw(self, frame, tracked_objects, count_in, count_out, over_capacity=False, current_inside=0,
+             scale=1.0):
+        """Draw the overlays; scale maps source-frame coordinates onto an already resized frame"""
         h, w = frame.shape[:2]
         
         # Draw tracked objects with tight bounding boxes
-        for obj in tracked_objects:
-            x1, y1, x2, y2 = obj["bbox"]
+        bboxes = tracked_objects.bboxes
+        if scale != 1.0:
+            bboxes = (bboxes * scale).astype(np.int32)
+        for track_id, (x1, y1, x2, y2) in zip(tracked_objects.ids.tolist(), bboxes.tolist()):
             
             # Ensure coordinates are within frame bounds
             x1 = max(0, min(x1, w-1))
@@ -22,7 +41,7 @@ class Visualizer:
             cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
             
             # Draw ID with background for better visibility
-            label = f"ID {obj['id']}"
+            label = f"ID {track_id}"
             label_size = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.6, 2)[0]
             
             # Background rectangle for text
@@ -30,45 +49,11 @@ class Visualizer:
             cv2.putText(frame, label, (x1 + 2, y1 - 5),
                         cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 0), 2)
 
-        # Draw counting line
-        if self.direction == "horizontal":
-            # Horizontal line (people cross vertically)
-            line_y = max(0, min(self.line_position, h-1))
-            cv2.line(frame, (0, line_y), (w, line_y), (0, 0, 255), 3)
-            
-            # Add arrows to show direction
-            cv2.arrowedLine(frame, (50, line_y - 20), (50, line_y - 5), (0, 255, 255), 2)
-            cv2.putText(frame, "IN", (55, line_y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 2)
-            
-            cv2.arrowedLine(frame, (100, line_y + 20), (100, line_y + 5), (255, 0, 255), 2)
-            cv2.putText(frame, "OUT", (105, line_y + 25), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 0, 255), 2)
-            
-        else:  # vertical line
-            # Vertical line (people cross horizontally)
-            line_x = max(0, min(self.line_position, w-1))
-            cv2.line(frame, (line_x, 0), (line_x, h), (0, 0, 255), 3)
-            
-            # Add arrows to show direction
-            cv2.arrowedLine(frame, (line_x - 20, 50), (line_x - 5, 50), (0, 255, 255), 2)
-            cv2.putText(frame, "IN", (line_x - 45, 55), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 2)
-            
-            cv2.arrowedLine(frame, (line_x + 20, 100), (line_x + 5, 100), (255, 0, 255), 2)
-            cv2.putText(frame, "OUT", (line_x + 25, 105), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 0, 255), 2)
-
-        # Draw statistics with background
-        stats_bg_color = (0, 0, 0)  # Black background
-        text_color = (255, 255, 255)  # White text
-        
-        # Background rectangles for better readability
-        cv2.rectangle(frame, (10, 10), (350, 100), stats_bg_color, -1)
+        # Draw counting line, direction arrows and stats background from the cache
+        self._apply_static_overlay(frame, int(self.line_position * scale))
         
-        # Draw counts
-        cv2.putText(frame, f"In: {count_in}  Out: {count_out}", (20, 35),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.8, text_color, 2)
-        cv2.putText(frame, f"Currently Inside: {current_inside}", (20, 65),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.8, text_color, 2)
-        cv2.putText(frame, f"Active Tracks: {len(tracked_objects)}", (20, 90),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 2)
+        # Draw counts from the cached text
+        self._apply_stats(frame, (count_in, count_out, current_inside, len(tracked_objects.ids)))
 
         # Warning if over capacity
         if over_capacity:
@@ -84,4 +69,116 @@ class Visualizer:
             cv2.putText(frame, warning_text, (text_x, text_y),
                         cv2.FONT_HERSHEY_SIMPLEX, 1.2, (255, 255, 255), 4)
 
-        return frame
\ No newline at end of file
+        return frame
+
+    def _apply_static_overlay(self, frame, line_position):
+        """Composite the cached static overlay, rebuilding it when the layout changed"""
+        h, w = frame.shape[:2]
+        key = (line_position, self.direction, h, w)
+        if key != self._overlay_key:
+            self._build_static_overlay(h, w, line_position)
+            self._overlay_key = key
+
+        # Only the regions that hold static drawings are touched
+        for roi in self._overlay_rois:
+            np.copyto(frame[roi], self._overlay[roi], where=self._overlay_mask[roi])
+
+        # The labels are anti-aliased, so they are drawn onto the frame rather than pasted
+        # through the boolean mask. The panel stays on top of them as before.
+        self._draw_labels(frame, h, w, line_position)
+        if self._labels_under_panel:
+            x1, y1, x2, y2 = STATS_PANEL
+            frame[y1:y2 + 1, x1:x2 + 1] = 0
+
+    def _draw_labels(self, frame, h, w, line_position):
+        """Draw the IN/OUT labels next to the direction arrows"""
+        if self.direction == "horizontal":
+            line_y = max(0, min(line_position, h-1))
+            cv2.putText(frame, "IN", (55, line_y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 2)
+            cv2.putText(frame, "OUT", (105, line_y + 25), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 0, 255), 2)
+        else:
+            line_x = max(0, min(line_position, w-1))
+            cv2.putText(frame, "IN", (line_x - 45, 55), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 2)
+            cv2.putText(frame, "OUT", (line_x + 25, 105), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 0, 255), 2)
+
+    def _apply_stats(self, frame, stats):
+        """Composite the stats text, rasterizing it again only when the numbers changed"""
+        h, w = frame.shape[:2]
+        x1, y1, _, y2 = STATS_PANEL
+        if h <= y1 or w <= x1:
+            return
+
+        # The text can run past the panel's right edge, so the cached strip spans the frame width
+        roi = np.s_[y1:min(y2 + 1, h), x1:w]
+        key = (stats, h, w)
+        if key != self._stats_key:
+            rh, rw = frame[roi].shape[:2]
+            self._stats_text = np.zeros((rh, rw, 3), np.uint8)
+            mask = np.zeros((rh, rw), np.uint8)
+            self._draw_stats(self._stats_text, stats, x1, y1, lambda color: color)
+            self._draw_stats(mask, stats, x1, y1, lambda color: 255)
+            self._stats_mask = (mask > 0)[..., None]
+            self._stats_key = key
+
+        np.copyto(frame[roi], self._stats_text, where=self._stats_mask)
+
+    def _draw_stats(self, img, stats, x0, y0, c):
+        """Draw the stats text into a strip whose top-left is (x0, y0) in the frame; c maps each color"""
+        count_in, count_out, current_inside, active_tracks = stats
+        text_color = (255, 255, 255)  # White text
+        cv2.putText(img, f"In: {count_in}  Out: {count_out}", (20 - x0, 35 - y0),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.8, c(text_color), 2)
+        cv2.putText(img, f"Currently Inside: {current_inside}", (20 - x0, 65 - y0),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.8, c(text_color), 2)
+        cv2.putText(img, f"Active Tracks: {active_tracks}", (20 - x0, 90 - y0),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, c((0, 255, 255)), 2)
+
+    def _build_static_overlay(self, h, w, line_position):
+        """Render the static drawings into an overlay image plus a coverage mask"""
+        self._overlay = np.zeros((h, w, 3), np.uint8)
+        mask = np.zeros((h, w), np.uint8)
+        self._draw_static(self._overlay, h, w, line_position, lambda color: color)
+        self._draw_static(mask, h, w, line_position, lambda color: 255)
+        self._overlay_mask = (mask > 0)[..., None]
+
+        x1, y1, x2, y2 = STATS_PANEL
+        self._overlay_rois = [np.s_[y1:y2 + 1, x1:x2 + 1]]
+        if self.direction == "horizontal":
+            line_y = max(0, min(line_position, h-1))
+            self._overlay_rois.append(np.s_[max(0, line_y - 30):line_y + 30, :])
+        else:
+            line_x = max(0, min(line_position, w-1))
+            self._overlay_rois.append(np.s_[:, max(0, line_x - 50):line_x + 70])
+
+        # Labels near the panel have to be covered by it again after being drawn
+        x1, y1, x2, y2 = STATS_PANEL
+        if self.direction == "horizontal":
+            self._labels_under_panel = line_y - 30 <= y2
+        else:
+            self._labels_under_panel = line_x - 50 <= x2
+
+    def _draw_static(self, img, h, w, line_position, c):
+        """Draw counting line, arrows and stats background; c maps each color"""
+        if self.direction == "horizontal":
+            # Horizontal line (people cross vertically)
+            line_y = max(0, min(line_position, h-1))
+            cv2.line(img, (0, line_y), (w, line_y), c((0, 0, 255)), 3)
+            
+            # Add arrows to show direction
+            cv2.arrowedLine(img, (50, line_y - 20), (50, line_y - 5), c((0, 255, 255)), 2)
+            
+            cv2.arrowedLine(img, (100, line_y + 20), (100, line_y + 5), c((255, 0, 255)), 2)
+            
+        else:  # vertical line
+            # Vertical line (people cross horizontally)
+            line_x = max(0, min(line_position, w-1))
+            cv2.line(img, (line_x, 0), (line_x, h), c((0, 0, 255)), 3)
+            
+            # Add arrows to show direction
+            cv2.arrowedLine(img, (line_x - 20, 50), (line_x - 5, 50), c((0, 255, 255)), 2)
+            
+            cv2.arrowedLine(img, (line_x + 20, 100), (line_x + 5, 100), c((255, 0, 255)), 2)
+
+        # Background rectangle for better readability
+        x1, y1, x2, y2 = STATS_PANEL
+        cv2.rectangle(img, (x1, y1), (x2, y2), c((0, 0, 0)), -1)
\ No newline at end of file